@@ -8,8 +8,162 @@ Bu dosyada, operatör atama problemi için kullandığım Q-learning ajanı var.
 import pickle
 import h5py
 import numpy as np
-import ast
-from typing import Tuple, Dict, Optional
+import ast  # Sadece eski (state_keys string'li) .h5 dosyalarını okumak için
+from collections.abc import Mapping
+from typing import Tuple, Dict, Iterator, Optional
+
+from agent.replay_buffer import ReplayBuffer, PrioritizedReplayBuffer
+from utils.jit import njit
+
+
+# Rastgele sayıları tek tek değil, bu büyüklükte paketler halinde çekiyorum
+_RANDOM_BATCH_SIZE = 4096
+
+# Q-matrisi satırlarını bu büyüklükte parçalar halinde ayırıyorum (yeni durumda yeniden boyutlandırma olmasın)
+_Q_CHUNK_ROWS = 4096
+
+
+@njit(cache=True, fastmath=True)
+def _q_update(Q, s_idx, action, reward, next_s_idx, done, alpha, gamma):
+    """
+    Tek bir geçiş için Q-learning güncellemesi (Q matrisi yerinde değişir).
+
+    next_s_idx < 0 ise bir sonraki durum daha önce görülmemiş demektir, Q-değeri 0 kabul edilir.
+    """
+    if done or next_s_idx < 0:
+        max_next_q = 0.0
+    else:
+        max_next_q = Q[next_s_idx].max()
+    target_q = reward + gamma * max_next_q
+    Q[s_idx, action] += alpha * (target_q - Q[s_idx, action])
+
+
+@njit(cache=True)
+def _select_greedy(q_row, tie_u):
+    """
+    Satırdaki en yüksek Q-değerli eylemi döndürür; eşitlik varsa aralarından rastgele seçer.
+
+    tie_u: [0, 1) aralığında, eşitlik bozmak için kullanılan hazır rastgele sayı.
+    """
+    best_action = q_row.argmax()
+    is_best = q_row == q_row[best_action]
+    # Eğitim ilerledikçe eşitlik nadir; o durumda argmax yeterli
+    if np.count_nonzero(is_best) == 1:
+        return best_action
+    best_actions = np.flatnonzero(is_best)
+    return best_actions[int(tie_u * best_actions.size)]
+
+
+@njit(cache=True, fastmath=True)
+def _update_and_select(Q, s_idx, action, reward, next_s_idx, done, alpha, gamma,
+                       epsilon, explore_u, tie_u, random_action):
+    """
+    Önceki geçişin güncellemesini yapıp bir sonraki durum için eylemi seçer (tek çağrıda).
+
+    _q_update + _select_greedy'nin birleşimi; eğitim döngüsünde her adımda iki ayrı
+    Python çağrısı yerine tek bir derlenmiş çağrı yapılıyor. Episode bittiyse -1 döner.
+    """
+    if done or next_s_idx < 0:
+        max_next_q = 0.0
+    else:
+        max_next_q = Q[next_s_idx].max()
+    Q[s_idx, action] += alpha * (reward + gamma * max_next_q - Q[s_idx, action])
+
+    if done:
+        return -1
+    # Keşif ya da hiç görülmemiş durum (tüm Q-değerleri 0, hepsi eşit)
+    if explore_u < epsilon or next_s_idx < 0:
+        return random_action
+    return _select_greedy(Q[next_s_idx], tie_u)
+
+
+def _state_layout(state: Tuple) -> list:
+    """
+    Durum tuple'ının yapısını döndürür: skaler elemanlar için -1, iç tuple'lar için uzunluğu.
+
+    Örn. (1, 2, (0, 1, 1)) -> [-1, -1, 3]. HDF5'te durumları düz bir tamsayı
+    matrisi olarak saklayıp geri kurabilmek için kullanıyorum.
+    """
+    return [len(item) if isinstance(item, tuple) else -1 for item in state]
+
+
+def _flatten_state(state: Tuple) -> list:
+    """İç içe durum tuple'ını düz bir tamsayı listesine açar."""
+    flat = []
+    for item in state:
+        if isinstance(item, tuple):
+            flat.extend(item)
+        else:
+            flat.append(item)
+    return flat
+
+
+def _unflatten_states(states_arr: np.ndarray, layout: list) -> list:
+    """_flatten_state ile açılmış satırları, verilen yapıya göre tekrar tuple'a çevirir."""
+    slices = []
+    pos = 0
+    for length in layout:
+        if length < 0:
+            slices.append((pos, None))
+            pos += 1
+        else:
+            slices.append((pos, pos + length))
+            pos += length
+
+    states = []
+    for row in states_arr.tolist():
+        states.append(tuple(
+            row[start] if end is None else tuple(row[start:end])
+            for start, end in slices
+        ))
+    return states
+
+
+def _upgrade_legacy_state(state: Tuple) -> Tuple:
+    """
+    Eski formattaki (state_keys / pickle) dosyalardan gelen bir FactoryEnv durumunu güncel anahtara çevirir.
+
+    O dosyalarda operatör müsaitliği 0/1 tuple'ı, beceri kovaları da operatör başına
+    tuple olarak duruyordu; artık ikisi de tek tamsayı (i. bit = operatör i boşta,
+    kovalar 3 tabanında paketli). Sadece eski yükleme yollarında çağrılıyor; o eski
+    8 alanlı yapıya uymayan durumlar (başka ortamların durumları) olduğu gibi dönüyor.
+    """
+    if not (len(state) == 8 and isinstance(state[5], tuple) and isinstance(state[6], tuple)
+            and isinstance(state[7], tuple)):
+        return state
+    availability = sum(flag << i for i, flag in enumerate(state[5]))
+    skill_key = sum(bucket * 3 ** i for i, bucket in enumerate(state[6]))
+    return state[:5] + (availability, skill_key, state[7])
+
+
+class _QTableView(Mapping):
+    """
+    Yoğun Q-matrisinin üzerine oturan, salt-okunur sözlük görünümü.
+
+    Eskiden agent.Q doğrudan {state: {action: q}} sözlüğüydü; script'ler hâlâ
+    bu şekilde okuyabilsin diye bu küçük sarmalayıcıyı bıraktım. Her satır için
+    sadece sıfır olmayan Q-değerleri döndürülüyor (load_h5 ile aynı mantık).
+    """
+
+    __slots__ = ("_agent",)
+
+    def __init__(self, agent: "QLearningAgent"):
+        self._agent = agent
+
+    def __getitem__(self, state: Tuple) -> Dict[int, float]:
+        # tolist() satırı tek seferde Python float'larına çeviriyor; eleman eleman
+        # NumPy skaleri üretip float()'a sokmaktan çok daha ucuz
+        row = self._agent._Q[self._agent._state_index[state]].tolist()
+        return {action: q for action, q in enumerate(row) if q != 0.0}
+
+    def __contains__(self, state) -> bool:
+        return state in self._agent._state_index
+
+    def __iter__(self) -> Iterator[Tuple]:
+        return iter(self._agent._state_index)
+
+    def __len__(self) -> int:
+        return len(self._agent._state_index)
 
 
 class QLearningAgent:
@@ -19,6 +173,30 @@ class QLearningAgent:
     Kısaca: (state, action) → Q değeri tutan bir tablo var ve bu tabloyu
     her adımda güncelliyoruz. Eylem seçiminde de klasik epsilon-greedy kullanıyorum.
     """
+
+    # Her adımda okunan öznitelikler __dict__ yerine sabit slotlarda dursun
+    # (Q bir property, o yüzden burada yok)
+    __slots__ = (
+        "num_actions",
+        "learning_rate_start",
+        "learning_rate_end",
+        "learning_rate",
+        "discount_factor",
+        "epsilon_start",
+        "epsilon_end",
+        "epsilon_decay_episodes",
+        "_epsilon_table",
+        "_alpha_table",
+        "_state_index",
+        "_Q",
+        "_rng",
+        "_explore_draws",
+        "_tie_draws",
+        "_action_draws",
+        "_draw_pos",
+        "replay_batch_size",
+        "replay_buffer",
+    )
     
     def __init__(
         self,
@@ -28,6 +206,10 @@ class QLearningAgent:
         epsilon_start: float = 1.0,
         epsilon_end: float = 0.05,
         epsilon_decay_episodes: int = 500,
+        replay_capacity: int = 0,
+        replay_batch_size: int = 32,
+        prioritized_replay: bool = False,
+        seed: Optional[int] = None,
     ):
         """
         Q-learning ajanını başlatıyorum.
@@ -35,6 +217,13 @@ class QLearningAgent:
         num_actions: Ortamda kaç farklı aksiyon var (genelde operatör sayısı + 1).
         Diğer parametreler de klasik RL sembollerine karşılık geliyor (alpha, gamma, epsilon).
         Burada değerleri teoriden çok, birkaç deneme-sonuç ile ayarladım.
+
+        replay_capacity > 0 verilirse, her update() çağrısında geçiş bir replay tamponuna
+        yazılıyor ve ek olarak replay_batch_size büyüklüğünde bir mini-batch tek seferde
+        (vektörel) güncelleniyor. Varsayılan 0, yani klasik tek adımlı Q-learning.
+        prioritized_replay=True ise geçişler TD-hatasına göre (sum-tree ile) örnekleniyor.
+        seed verilirse eylem seçimindeki ve replay örneklemesindeki rastgelelik
+        tekrarlanabilir oluyor (ikisi de aynı tohumlu üreticiyi kullanıyor).
         """
         self.num_actions = num_actions
         # Öğrenme oranı için başlangıç ve bitiş değerleri
@@ -47,43 +236,153 @@ class QLearningAgent:
         self.epsilon_start = epsilon_start
         self.epsilon_end = epsilon_end
         self.epsilon_decay_episodes = epsilon_decay_episodes
+        self._build_schedules()
         
-        # Q-tablosu: (durum_tuple, eylem_int) -> float eşlemesi
-        self.Q: Dict[Tuple, Dict[int, float]] = {}
+        # Q-tablosu: yoğun (num_states, num_actions) matris.
+        # Durum tuple'ı -> satır indeksi eşlemesini ayrı bir sözlükte tutuyorum;
+        # böylece argmax/max/güncelleme tek bir satır üzerinde NumPy ile yapılıyor.
+        self._state_index: Dict[Tuple, int] = {}
+        # float32: bellek ve bant genişliği float64'ün yarısı, tabular Q için hassasiyet yeterli
+        self._Q = np.zeros((_Q_CHUNK_ROWS, num_actions), dtype=np.float32)
+
+        # Eylem seçimi için rastgele sayılar: PCG64 üreticisinden paket paket çekilir
+        # (replay tamponu da örneklemede aynı üreticiyi kullanıyor)
+        self._rng = np.random.default_rng(seed)
+        self._refill_random_draws()
+
+        # İsteğe bağlı deneyim tekrar tamponu
+        self.replay_batch_size = replay_batch_size
+        self.replay_buffer: Optional[ReplayBuffer] = None
+        if replay_capacity > 0:
+            buffer_cls = PrioritizedReplayBuffer if prioritized_replay else ReplayBuffer
+            self.replay_buffer = buffer_cls(replay_capacity, rng=self._rng)
+
+    @property
+    def Q(self) -> _QTableView:
+        """Q-tablosunun {state: {action: q}} şeklindeki salt-okunur görünümü (geriye dönük uyumluluk için)."""
+        return _QTableView(self)
+
+    def q_values(self, state: Tuple) -> Optional[np.ndarray]:
+        """
+        Bir durumun tüm eylemler için Q-değerleri (yoğun tablodaki satırın salt-okunur görünümü).
+
+        Durum hiç görülmemişse None. Değerlendirme script'lerinde Q sözlük görünümü yerine
+        bunu kullanıyorum; her adımda sözlük kurmadan doğrudan argmax alınabiliyor.
+        """
+        s_idx = self._state_index.get(state)
+        if s_idx is None:
+            return None
+        row = self._Q[s_idx]
+        row.flags.writeable = False
+        return row
+
+    def num_state_action_pairs(self) -> int:
+        """
+        Q-değeri sıfır olmayan (durum, eylem) çifti sayısı.
+
+        Eskiden script'ler bunu Q sözlük görünümü üzerinden sayıyordu (her durum için
+        bir sözlük kurarak); yoğun tabloda tek bir count_nonzero yetiyor.
+        """
+        return int(np.count_nonzero(self._Q[:len(self._state_index)]))
+
+    def _refill_random_draws(self) -> None:
+        """
+        select_action'ın kullanacağı rastgele sayı paketlerini yeniler.
+
+        Her select_action çağrısı üç listeden de aynı sıradaki elemanı kullanıyor:
+        keşif kararı, eşitlik bozma ve rastgele eylem. Listeler Python float/int
+        tuttuğu için okumak tek bir indeksleme kadar ucuz.
+        """
+        self._explore_draws = self._rng.random(_RANDOM_BATCH_SIZE).tolist()
+        self._tie_draws = self._rng.random(_RANDOM_BATCH_SIZE).tolist()
+        self._action_draws = self._rng.integers(0, self.num_actions, _RANDOM_BATCH_SIZE).tolist()
+        self._draw_pos = 0
+
+    def _state_id(self, state: Tuple) -> int:
+        """
+        Durumun Q-matrisindeki satır indeksini döndürür; durum yeni ise sıfırlarla dolu bir satır açar.
+
+        setdefault ile durum tek bir hash/arama ile hem bulunuyor hem (yeniyse) kaydediliyor;
+        her durum ilk görüldüğü anda kalıcı bir satır indeksine bağlanıyor. Matris dolunca
+        en az _Q_CHUNK_ROWS satır (veya mevcut boyut kadar) büyütüyorum, böylece her yeni
+        durumda kopyalama yapılmıyor.
+        """
+        state_index = self._state_index
+        idx = state_index.setdefault(state, len(state_index))
+        if idx >= self._Q.shape[0]:
+            rows = self._Q.shape[0]
+            grown = np.zeros((rows + max(_Q_CHUNK_ROWS, rows), self.num_actions), dtype=self._Q.dtype)
+            grown[:rows] = self._Q
+            self._Q = grown
+        return idx
+
+    def _set_table(self, q_table: Dict[Tuple, Dict[int, float]]) -> None:
+        """{state: {action: q}} sözlüğünden yoğun Q-matrisini yeniden kurar (yükleme fonksiyonları için)."""
+        self._state_index = {}
+        self._Q = np.zeros((max(_Q_CHUNK_ROWS, len(q_table)), self.num_actions), dtype=np.float32)
+        for state, action_dict in q_table.items():
+            s_idx = self._state_id(state)
+            for action, value in action_dict.items():
+                self._Q[s_idx, action] = value
     
-    def get_epsilon(self, episode_index: int) -> float:
+    def _set_dense(self, states: list, q_values: np.ndarray) -> None:
+        """Durum listesi ve (num_states, num_actions) Q-matrisinden tabloyu doğrudan kurar."""
+        num_states = len(states)
+        self._state_index = {state: i for i, state in enumerate(states)}
+        self._Q = np.zeros((max(_Q_CHUNK_ROWS, num_states), self.num_actions), dtype=np.float32)
+        self._Q[:num_states] = q_values
+
+    @staticmethod
+    def _encode_states(states: list) -> Tuple[np.ndarray, list]:
         """
-        Verilen episode için o anda kullanacağımız epsilon değerini döndürür.
+        Durum tuple'larını (num_states, state_dim) tamsayı matrisine ve yapı listesine çevirir.
+
+        Değerler küçük tamsayılar; sığıyorsa int16, sığmıyorsa int64 kullanılıyor.
+        """
+        layout = _state_layout(states[0]) if states else []
+        if not states:
+            return np.zeros((0, 0), dtype=np.int16), layout
+        states_arr = np.array([_flatten_state(state) for state in states], dtype=np.int64)
+        if states_arr.min() >= np.iinfo(np.int16).min and states_arr.max() <= np.iinfo(np.int16).max:
+            states_arr = states_arr.astype(np.int16)
+        return states_arr, layout
+
+    def _build_schedules(self) -> None:
+        """
+        Epsilon ve öğrenme oranı programlarını episode başına bir kez, dizi olarak hesaplar.
 
-        Burada iki aşamalı basit bir program var:
+        Epsilon iki aşamalı:
         - İlk kısımda epsilon hızlıca düşüyor (ajan ortamı kaba taslak tanıyor).
         - Sonrasında daha yavaş düşüyor (öğrendiklerini ince ayar yapıyor).
+        Alfa ise learning_rate_start'tan learning_rate_end'e doğrusal iniyor.
+        Böylece get_epsilon/get_learning_rate her adımda sadece diziden okuma yapıyor.
         """
-        if episode_index >= self.epsilon_decay_episodes:
-            return self.epsilon_end
+        episodes = np.arange(self.epsilon_decay_episodes + 1, dtype=np.float64)
 
         # Toplam decay aralığını iki parçaya böl
-        split_point = int(0.3 * self.epsilon_decay_episodes)
-        if split_point <= 0:
-            split_point = 1
-
-        if episode_index <= split_point:
-            # Hızlı ilk faz: 1.0 -> yaklaşık 0.3
-            start = self.epsilon_start
-            mid = max(0.3, self.epsilon_end)
-            ratio = episode_index / split_point
-            epsilon = start + ratio * (mid - start)
-        else:
-            # Yavaş ikinci faz: 0.3 -> epsilon_end
-            remaining = self.epsilon_decay_episodes - split_point
-            if remaining <= 0:
-                return max(self.epsilon_end, 0.0)
-            ratio = (episode_index - split_point) / remaining
-            start = max(0.3, self.epsilon_end)
-            end = self.epsilon_end
-            epsilon = start + ratio * (end - start)
+        split_point = max(1, int(0.3 * self.epsilon_decay_episodes))
+        mid = max(0.3, self.epsilon_end)
+        # Hızlı ilk faz: 1.0 -> yaklaşık 0.3
+        fast = self.epsilon_start + (episodes / split_point) * (mid - self.epsilon_start)
+        # Yavaş ikinci faz: 0.3 -> epsilon_end
+        remaining = max(1, self.epsilon_decay_episodes - split_point)
+        slow = mid + ((episodes - split_point) / remaining) * (self.epsilon_end - mid)
+        epsilon = np.where(episodes <= split_point, fast, slow)
+        self._epsilon_table = np.maximum(np.minimum(epsilon, self.epsilon_start), self.epsilon_end)
+
+        # Basit doğrusal azalma: learning_rate_start -> learning_rate_end
+        ratio = episodes / max(1, self.epsilon_decay_episodes)
+        self._alpha_table = self.learning_rate_start + ratio * (self.learning_rate_end - self.learning_rate_start)
+
+    def get_epsilon(self, episode_index: int) -> float:
+        """
+        Verilen episode için o anda kullanacağımız epsilon değerini döndürür.
 
-        return max(min(epsilon, self.epsilon_start), self.epsilon_end)
+        Değerler __init__'te hesaplanan tablodan okunuyor (bkz. _build_schedules).
+        """
+        if episode_index >= self.epsilon_decay_episodes:
+            return self.epsilon_end
+        return float(self._epsilon_table[episode_index])
 
     def get_learning_rate(self, episode_index: int) -> float:
         """
@@ -95,9 +394,7 @@ class QLearningAgent:
         if episode_index >= self.epsilon_decay_episodes:
             alpha = self.learning_rate_end
         else:
-            # Basit doğrusal azalma: learning_rate_start -> learning_rate_end
-            ratio = episode_index / max(1, self.epsilon_decay_episodes)
-            alpha = self.learning_rate_start + ratio * (self.learning_rate_end - self.learning_rate_start)
+            alpha = self._alpha_table[episode_index]
 
         # İçeride de güncel alfa değerini saklayalım
         self.learning_rate = float(alpha)
@@ -109,28 +406,30 @@ class QLearningAgent:
 
         Eğitimde epsilon-greedy, değerlendirmede ise tamamen greedy kullanıyorum.
         """
-        import random
-        
         if use_greedy:
             epsilon = 0.0  # Değerlendirmede keşif yok
         else:
             epsilon = self.get_epsilon(episode_index)
         
+        # Bu çağrı için hazır rastgele sayıları al (paket bittiyse yenile)
+        pos = self._draw_pos
+        if pos == _RANDOM_BATCH_SIZE:
+            self._refill_random_draws()
+            pos = 0
+        self._draw_pos = pos + 1
+        
         # Epsilon-greedy: epsilon olasılığıyla keşif yap
-        if random.random() < epsilon:
-            return random.randint(0, self.num_actions - 1)
+        if self._explore_draws[pos] < epsilon:
+            return self._action_draws[pos]
         
         # Greedy: en yüksek Q-değerine sahip eylemi seç
-        q_values = {}
-        for action in range(self.num_actions):
-            q_values[action] = self.Q.get(state, {}).get(action, 0.0)
-        
-        # En yüksek Q-değerini bul
-        max_q = max(q_values.values())
-        best_actions = [a for a, q in q_values.items() if q == max_q]
+        s_idx = self._state_index.get(state)
+        if s_idx is None:
+            # Hiç görülmemiş durum: tüm Q-değerleri 0, yani hepsi eşit
+            return self._action_draws[pos]
         
         # Aynı Q-değerine sahip birden fazla eylem varsa, aralarından rastgele seç
-        return random.choice(best_actions)
+        return int(_select_greedy(self._Q[s_idx], self._tie_draws[pos]))
     
     def update(
         self,
@@ -147,98 +446,207 @@ class QLearningAgent:
 
         Not: Burada formülü bire bir uygulayıp, gereksiz ek karmaşıklık koymadım.
         """
-        # Q-değerleri yoksa başlat
-        if state not in self.Q:
-            self.Q[state] = {}
-        if action not in self.Q[state]:
-            self.Q[state][action] = 0.0
-        
-        # Mevcut Q-değerini al
-        current_q = self.Q[state][action]
-        
-        # Hedef Q-değerini hesapla
-        if done:
-            target_q = reward  # Episode bitti, gelecek ödül yok
-        else:
-            # Bir sonraki durum için maksimum Q-değerini bul
-            if next_state in self.Q:
-                max_next_q = max(
-                    self.Q[next_state].get(a, 0.0)
-                    for a in range(self.num_actions)
-                )
-            else:
-                # Bir sonraki durum daha önce görülmemiş, varsayılan 0
-                max_next_q = 0.0
-            
-            target_q = reward + self.discount_factor * max_next_q
+        # Durum yeni ise satırını aç (Q-değerleri 0 ile başlar)
+        s_idx = self._state_id(state)
+        # Bir sonraki durum görülmemişse -1 veriyorum (max Q = 0 kabul ediliyor)
+        ns_idx = self._state_index.get(next_state, -1)
         
         # Bu adım için öğrenme oranını belirle
         alpha = self.learning_rate if episode_index is None else self.get_learning_rate(episode_index)
 
-        # Q-learning güncellemesi
-        self.Q[state][action] = current_q + alpha * (target_q - current_q)
+        # Q-learning güncellemesi (sayısal kısım derlenmiş çekirdekte)
+        _q_update(self._Q, s_idx, action, float(reward), ns_idx, done, alpha, self.discount_factor)
+
+        if self.replay_buffer is not None:
+            # Tamponda sonraki durumun da satırı olmalı; sonradan öğrenilen değerleri görebilsin
+            ns_idx = self._state_id(next_state)
+            self.replay_buffer.push(s_idx, action, reward, ns_idx, done)
+            self.replay(self.replay_batch_size, alpha)
+
+    def learn_and_select(
+        self,
+        state: Tuple,
+        action: int,
+        reward: float,
+        next_state: Tuple,
+        done: bool,
+        episode_index: int,
+    ) -> int:
+        """
+        update() ile bir sonraki select_action() çağrısını tek adımda yapar.
+
+        Eğitim döngüsünde her adımda önce güncelleme, sonra yeni durum için eylem
+        seçimi yapılıyor; ikisini tek bir derlenmiş çekirdekte birleştiriyorum.
+        Sonuç, sırayla update() + select_action(next_state, episode_index) çağırmakla aynı.
+
+        Returns:
+            next_state için seçilen eylem; episode bittiyse (done=True) -1
+        """
+        if self.replay_buffer is not None:
+            # Replay açıkken güncelleme batch'li yapılıyor; ayrı ayrı çağırıyorum
+            self.update(state, action, reward, next_state, done, episode_index=episode_index)
+            return -1 if done else self.select_action(next_state, episode_index)
+
+        s_idx = self._state_id(state)
+        ns_idx = self._state_index.get(next_state, -1)
+        alpha = self.get_learning_rate(episode_index)
+
+        if done:
+            _q_update(self._Q, s_idx, action, float(reward), ns_idx, True, alpha, self.discount_factor)
+            return -1
+
+        pos = self._draw_pos
+        if pos == _RANDOM_BATCH_SIZE:
+            self._refill_random_draws()
+            pos = 0
+        self._draw_pos = pos + 1
+
+        return int(_update_and_select(
+            self._Q, s_idx, action, float(reward), ns_idx, False, alpha, self.discount_factor,
+            self.get_epsilon(episode_index), self._explore_draws[pos], self._tie_draws[pos],
+            self._action_draws[pos],
+        ))
+
+    def replay(self, batch_size: int, alpha: Optional[float] = None) -> None:
+        """
+        Replay tamponundan bir mini-batch çekip hepsini tek seferde günceller.
+
+        Aynı formül, sadece batch_size adet geçiş için NumPy dizileriyle:
+        Q[s,a] ← Q[s,a] + alpha * w * (r + gamma * max Q[s'] * (1 - done) − Q[s,a])
+
+        w, öncelikli tamponda importance-sampling ağırlığı, uniform tamponda 1.
+        Batch'te aynı (s, a) çifti birden fazla kez çıkabiliyor (küçük tampon, öncelikli
+        örnekleme); np.add.at ile hepsinin güncellemesi toplanıyor, son yazılan diğerlerini
+        ezmiyor. TD-hataları batch başındaki Q-değerlerinden hesaplanıyor.
+        Hesaplanan TD-hataları öncelik olarak tampona geri yazılıyor.
+        """
+        if self.replay_buffer is None or len(self.replay_buffer) == 0:
+            return
+        if alpha is None:
+            alpha = self.learning_rate
+
+        slots, states, actions, rewards, next_states, dones, weights = self.replay_buffer.sample(batch_size)
+        max_next_q = self._Q[next_states].max(axis=1)
+        target_q = rewards + self.discount_factor * max_next_q * ~dones
+        current_q = self._Q[states, actions]
+        td_errors = target_q - current_q
+        np.add.at(self._Q, (states, actions), alpha * weights * td_errors)
+        self.replay_buffer.update_priorities(slots, td_errors)
     
     def save(self, path: str):
         """
-        Q-tablosunu pickle kullanarak diske kaydeder.
+        Q-tablosunu sıkıştırılmış NumPy arşivi (.npz) olarak diske kaydeder.
+        
+        Arşivde yoğun Q-matrisi ("Q"), düzleştirilmiş durumlar ("states") ve durum
+        yapısı ("state_layout") var. Pickle'lanmış sözlüğe göre hem çok daha küçük
+        hem de yüklemesi daha hızlı. Dosya adı değişmesin diye (np.savez ".npz"
+        ekliyor) açık dosya nesnesine yazıyorum.
         
         Args:
             path: Q-tablosunu kaydetmek için dosya yolu
         """
+        states = list(self._state_index)
+        states_arr, layout = self._encode_states(states)
         with open(path, 'wb') as f:
-            pickle.dump(self.Q, f)
+            np.savez_compressed(
+                f,
+                Q=self._Q[:len(states)],
+                states=states_arr,
+                state_layout=np.array(layout, dtype=np.int16),
+            )
     
     def load(self, path: str):
         """
-        Q-tablosunu pickle kullanarak diskten yükler.
+        save() ile kaydedilmiş Q-tablosunu diskten yükler.
+        
+        Eski sürümlerin pickle ile kaydettiği {state: {action: q}} dosyaları da
+        okunabiliyor; format dosyanın ilk byte'larından anlaşılıyor (.npz bir zip arşivi).
         
         Args:
             path: Q-tablosunu yüklemek için dosya yolu
         """
         with open(path, 'rb') as f:
-            self.Q = pickle.load(f)
+            is_npz = f.read(2) == b'PK'
+        
+        if not is_npz:
+            with open(path, 'rb') as f:
+                q_table = pickle.load(f)
+            # Eski pickle dosyalarında durumlar eski (tuple'lı) FactoryEnv anahtarlarıyla duruyor
+            self._set_table({_upgrade_legacy_state(state): actions for state, actions in q_table.items()})
+            return
+        
+        with np.load(path) as data:
+            states = _unflatten_states(data["states"], data["state_layout"].tolist())
+            self._set_dense(states, data["Q"])
     
-    def save_h5(self, path: str) -> None:
+    def save_h5(self, path: str, quantize: bool = False) -> None:
         """
         Q-tablosunu HDF5 (.h5) formatında kaydeder.
         
         Q-tablosu, verimli çapraz dil erişimi için matris formunda saklanır:
-        - "state_keys": durum tuple'larını temsil eden UTF-8 kodlu string dizisi
+        - "states": (num_states, state_dim) tamsayı matrisi; her satır düzleştirilmiş bir durum tuple'ı
+        - "state_layout": durum tuple'ının yapısı (skaler için -1, iç tuple için uzunluğu)
         - "q_values": (num_states, num_actions) şeklinde 2D float32 dizisi
         
         Bu format, Q-tablolarını farklı programlama dilleri arasında paylaşmak ve
         büyük Q-tablolarını verimli şekilde saklamak için uygundur. Not: Bu hala
         tabular Q-learning (sinir ağı değil); sadece kalıcılık için HDF5 kullanıyoruz.
         
+        quantize=True ise "q_values" yerine satır başına ölçeklenmiş int8 değerler saklanır:
+        - "q_values_i8": (num_states, num_actions) int8 dizisi
+        - "scales": satır başına float32 ölçek (q ≈ q_values_i8 * scale)
+        Dosya yaklaşık 4 kat küçülür; her satırda en büyük değere göre ~%0.4 hassasiyet kaybı olur.
+        
         Args:
             path: Q-tablosunu kaydetmek için dosya yolu
+            quantize: True ise Q-değerlerini int8'e sıkıştırarak kaydet
         """
-        # Tüm benzersiz durumları topla
-        state_to_index = {}
-        for state, _ in self.Q.items():
-            if state not in state_to_index:
-                state_to_index[state] = len(state_to_index)
-        
+        # Durum -> satır indeksi eşlemesi zaten elimizde
+        state_to_index = self._state_index
         num_states = len(state_to_index)
         
-        # Q-değeri matrisini ayır
-        q_values = np.zeros((num_states, self.num_actions), dtype=np.float32)
-        
-        # Q-değerlerini doldur
-        for state, action_dict in self.Q.items():
-            s_idx = state_to_index[state]
-            for action, value in action_dict.items():
-                q_values[s_idx, action] = value
+        # Q-değerleri zaten yoğun matriste; satır satır doldurmak yerine ilk num_states satırı alıyorum
+        q_values = self._Q[:num_states]
         
-        # Durum anahtarlarını string olarak oluştur (tutarlılık için indekse göre sıralı)
-        sorted_states = sorted(state_to_index.items(), key=lambda kv: kv[1])
-        state_keys = [repr(state) for state, _ in sorted_states]
+        # Durumları düz tamsayı matrisine çevir. Sözlük ekleme sırasını koruyor ve indeksler
+        # len() ile sırayla verildiği için anahtar sırası zaten satır sırası; sıralamaya gerek yok.
+        states_arr, layout = self._encode_states(list(state_to_index))
         
         # HDF5'e kaydet
         with h5py.File(path, 'w') as f:
-            # Durum anahtarlarını sabit uzunluklu string olarak sakla (S256 en fazla 256 karakter)
-            f.create_dataset("state_keys", data=np.array(state_keys, dtype="S256"))
-            f.create_dataset("q_values", data=q_values)
+            f.create_dataset("states", data=states_arr, **self._h5_compression(states_arr))
+            f.create_dataset("state_layout", data=np.array(layout, dtype=np.int16))
+            if quantize:
+                q_i8, scales = self._quantize_rows(q_values)
+                f.create_dataset("q_values_i8", data=q_i8, **self._h5_compression(q_i8))
+                f.create_dataset("scales", data=scales)
+            else:
+                f.create_dataset("q_values", data=q_values, **self._h5_compression(q_values))
+
+    @staticmethod
+    def _h5_compression(data: np.ndarray) -> dict:
+        """
+        Büyük 2D dizileri parça parça (chunked) ve LZF ile sıkıştırılmış yazmak için ayarlar.
+
+        shuffle filtresi byte'ları yeniden sıraladığı için benzer büyüklükteki
+        sayılar daha iyi sıkışıyor. LZF gzip'ten hızlı, oranı da yakın.
+        Boş dizilerde chunk tanımlanamadığı için düz yazılıyor.
+        """
+        if data.size == 0:
+            return {}
+        return {
+            "chunks": (min(4096, data.shape[0]), data.shape[1]),
+            "compression": "lzf",
+            "shuffle": True,
+        }
+
+    @staticmethod
+    def _quantize_rows(q_values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Her satırı kendi mutlak maksimumuna göre [-127, 127] aralığına ölçekler."""
+        scales = (np.abs(q_values).max(axis=1) / 127.0).astype(np.float32)
+        safe_scales = np.where(scales > 0, scales, 1.0)  # Tamamen sıfır satırlar
+        q_i8 = np.round(q_values / safe_scales[:, None]).astype(np.int8)
+        return q_i8, scales
     
     def load_h5(self, path: str) -> None:
         """
@@ -248,21 +656,24 @@ class QLearningAgent:
             path: Q-tablosunu yüklemek için dosya yolu
         """
         with h5py.File(path, 'r') as f:
-            # Durum anahtarlarını oku ve byte'lardan string'e çöz
-            state_keys_bytes = f["state_keys"][:]
-            state_keys = [key.decode('utf-8') for key in state_keys_bytes]
+            if "states" in f:
+                # Düz tamsayı matrisinden durum tuple'larını geri kur
+                states = _unflatten_states(f["states"][:], f["state_layout"][:].tolist())
+            else:
+                # Eski format: durum anahtarları repr() string'i olarak saklanmış;
+                # güvenli şekilde değerlendirmek için ast.literal_eval kullan ve
+                # eski FactoryEnv durum anahtarlarını güncel anahtara çevir
+                states = [
+                    _upgrade_legacy_state(ast.literal_eval(key.decode('utf-8')))
+                    for key in f["state_keys"][:]
+                ]
             
-            # Q-değerleri matrisini oku
-            q_values = f["q_values"][:]
+            # Q-değerleri matrisini oku (int8 ile sıkıştırılmışsa geri ölçekle)
+            if "q_values_i8" in f:
+                q_values = f["q_values_i8"][:].astype(np.float32) * f["scales"][:][:, None]
+            else:
+                q_values = f["q_values"][:]
         
-        # Q-tablosu dictionary'sini yeniden oluştur
-        self.Q = {}
-        for i, state_str in enumerate(state_keys):
-            # Durum tuple string'ini güvenli şekilde değerlendirmek için ast.literal_eval kullan
-            state = ast.literal_eval(state_str)
-            self.Q[state] = {}
-            for action in range(self.num_actions):
-                q_val = float(q_values[i, action])
-                if q_val != 0.0:  # Bellek tasarrufu için sadece sıfır olmayan Q-değerlerini sakla
-                    self.Q[state][action] = q_val
+        # Yoğun matrisi doğrudan yüklüyorum; hücre hücre dolaşıp sıfırları ayıklamaya gerek yok
+        self._set_dense(states, q_values)
 
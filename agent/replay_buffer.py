@@ -0,0 +1,203 @@
+"""
+Q-learning ajanı için basit deneyim tekrar (experience replay) tamponu.
+
+Geçişleri (s, a, r, s', done) önceden ayrılmış NumPy dizilerinde halka tampon
+mantığıyla saklıyorum. Durumlar burada tuple değil, ajanın Q-matrisindeki satır
+indeksleri olarak tutuluyor; böylece mini-batch güncellemesi tek seferde
+NumPy ile yapılabiliyor.
+
+PrioritizedReplayBuffer ise geçişleri TD-hatalarının büyüklüğüne göre örnekliyor
+(öncelikli deneyim tekrarı); örnekleme için bir sum-tree kullanıyorum.
+"""
+
+import numpy as np
+from typing import Optional, Tuple
+
+
+# Önceliği 0 olan yaprağa düşen çekilişler en fazla bu kadar kez yeniden çekiliyor
+_MAX_REDRAWS = 8
+
+
+class ReplayBuffer:
+    """
+    Sabit kapasiteli halka tampon.
+
+    Kapasite dolunca en eski geçişin üzerine yazılıyor; push işlemi O(1).
+    """
+
+    def __init__(self, capacity: int, rng: Optional[np.random.Generator] = None):
+        """
+        capacity: Tamponda en fazla kaç geçiş tutulacağı.
+        rng: Örneklemede kullanılan üretici (ajan kendi tohumlu üreticisini veriyor);
+            verilmezse tohumsuz yeni bir üretici açılıyor.
+        """
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.capacity = capacity
+        self.states = np.zeros(capacity, dtype=np.int32)
+        self.actions = np.zeros(capacity, dtype=np.int16)
+        self.rewards = np.zeros(capacity, dtype=np.float32)
+        self.next_states = np.zeros(capacity, dtype=np.int32)
+        self.dones = np.zeros(capacity, dtype=bool)
+        self.pos = 0
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def push(self, s_idx: int, action: int, reward: float, next_s_idx: int, done: bool) -> int:
+        """
+        Bir geçişi tampona yazar ve yazıldığı slotun indeksini döndürür.
+        """
+        slot = self.pos
+        self.states[slot] = s_idx
+        self.actions[slot] = action
+        self.rewards[slot] = reward
+        self.next_states[slot] = next_s_idx
+        self.dones[slot] = done
+        self.pos = (slot + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        return slot
+
+    def sample(self, batch_size: int) -> Tuple[np.ndarray, ...]:
+        """
+        Tampondan düzgün (uniform) dağılımla batch_size adet geçiş çeker.
+
+        Returns:
+            (slots, states, actions, rewards, next_states, dones, weights) dizileri.
+            Uniform örneklemede tüm ağırlıklar 1.
+        """
+        slots = self.rng.integers(0, self.size, batch_size)
+        return self._gather(slots, np.ones(batch_size, dtype=np.float32))
+
+    def update_priorities(self, slots: np.ndarray, td_errors: np.ndarray) -> None:
+        """Uniform tamponda öncelik yok; PrioritizedReplayBuffer bunu eziyor."""
+
+    def _gather(self, slots: np.ndarray, weights: np.ndarray) -> Tuple[np.ndarray, ...]:
+        return (
+            slots,
+            self.states[slots],
+            self.actions[slots],
+            self.rewards[slots],
+            self.next_states[slots],
+            self.dones[slots],
+            weights,
+        )
+
+
+class SumTree:
+    """
+    Öncelikleri tutan toplam ağacı (sum-tree).
+
+    Yapraklar [capacity, 2*capacity) aralığında, her iç düğüm iki çocuğunun toplamı;
+    kök (indeks 1) tüm önceliklerin toplamı. Hem güncelleme hem örnekleme O(log N).
+    Kapasiteyi 2'nin kuvvetine yuvarlıyorum ki tüm yapraklar aynı derinlikte olsun.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = 1
+        while self.capacity < capacity:
+            self.capacity *= 2
+        self.depth = self.capacity.bit_length() - 1
+        self.tree = np.zeros(2 * self.capacity, dtype=np.float64)
+
+    @property
+    def total(self) -> float:
+        return float(self.tree[1])
+
+    def set(self, leaf: int, priority: float) -> None:
+        """Tek bir yaprağın önceliğini yazar ve yol boyunca toplamları günceller."""
+        node = leaf + self.capacity
+        self.tree[node] = priority
+        node //= 2
+        while node >= 1:
+            self.tree[node] = self.tree[2 * node] + self.tree[2 * node + 1]
+            node //= 2
+
+    def update(self, leaves: np.ndarray, priorities: np.ndarray) -> None:
+        """Verilen yaprakların önceliklerini yazar ve toplamları köke kadar seviye seviye günceller."""
+        nodes = np.asarray(leaves) + self.capacity
+        self.tree[nodes] = priorities
+        for _ in range(self.depth):
+            nodes = np.unique(nodes // 2)
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+
+    def find(self, values: np.ndarray) -> np.ndarray:
+        """
+        Her değer için kümülatif toplamı o değeri geçen yaprağı bulur.
+
+        Tüm örnekler için aynı anda, kökten yaprağa doğru vektörel iniş yapılıyor.
+        """
+        values = np.array(values, dtype=np.float64)
+        nodes = np.ones(values.shape[0], dtype=np.int64)
+        for _ in range(self.depth):
+            left = 2 * nodes
+            left_sum = self.tree[left]
+            go_right = values >= left_sum
+            values -= left_sum * go_right
+            nodes = left + go_right
+        return nodes - self.capacity
+
+
+class PrioritizedReplayBuffer(ReplayBuffer):
+    """
+    TD-hatasıyla orantılı örnekleme yapan replay tamponu.
+
+    Öncelik: p = (|td| + eps) ** priority_exponent. Yeni geçişler o ana kadarki en
+    büyük öncelikle giriyor ki en az bir kere örneklensin. Örneklemeden gelen sapmayı
+    azaltmak için importance-sampling ağırlıkları (beta) da döndürülüyor.
+    """
+
+    def __init__(self, capacity: int, priority_exponent: float = 0.6, beta: float = 0.4, eps: float = 1e-3,
+                 rng: Optional[np.random.Generator] = None):
+        super().__init__(capacity, rng)
+        self.priority_exponent = priority_exponent
+        self.beta = beta
+        self.eps = eps
+        self.max_priority = 1.0
+        self.tree = SumTree(capacity)
+
+    def push(self, s_idx: int, action: int, reward: float, next_s_idx: int, done: bool) -> int:
+        slot = super().push(s_idx, action, reward, next_s_idx, done)
+        self.tree.set(slot, self.max_priority)
+        return slot
+
+    def sample(self, batch_size: int) -> Tuple[np.ndarray, ...]:
+        """
+        Öncelik ağırlıklı olarak batch_size adet geçiş çeker.
+
+        Returns:
+            (slots, states, actions, rewards, next_states, dones, weights) dizileri
+        """
+        total = self.tree.total
+        leaves = self.tree.tree[self.tree.capacity:]
+        slots = self.tree.find(self.rng.uniform(0.0, total, batch_size))
+
+        # Kayan nokta hatası yüzünden boş ya da önceliği 0 olan bir yaprağa düşülebiliyor.
+        # Böyle bir geçiş hiç örneklenmemeli (olasılığı 0, ağırlığı sonsuz olur ve batch
+        # NaN'a döner): o çekilişleri yeniden yap, yine olmazsa önceliği pozitif dolu
+        # yapraklardan birini düzgün dağılımla seç.
+        bad = np.flatnonzero(leaves[slots] <= 0)
+        for _ in range(_MAX_REDRAWS):
+            if bad.size == 0:
+                break
+            slots[bad] = self.tree.find(self.rng.uniform(0.0, total, bad.size))
+            bad = bad[leaves[slots[bad]] <= 0]
+        if bad.size:
+            valid = np.flatnonzero(leaves[:self.size] > 0)
+            if valid.size == 0:
+                raise FloatingPointError("Öncelikli örneklemede önceliği pozitif geçiş yok")
+            slots[bad] = self.rng.choice(valid, bad.size)
+
+        probs = leaves[slots] / total
+        weights = (self.size * probs) ** (-self.beta)
+        weights /= weights.max()
+        if not np.isfinite(weights).all():
+            # NaN ağırlıklar doğrudan Q-tablosuna yazılırdı; sessizce devam etmeyelim
+            raise FloatingPointError(f"Öncelikli örneklemede sonlu olmayan ağırlık (toplam öncelik: {total})")
+        return self._gather(slots, weights.astype(np.float32))
+
+    def update_priorities(self, slots: np.ndarray, td_errors: np.ndarray) -> None:
+        """Batch güncellemesinden çıkan TD-hatalarını yeni öncelik olarak yazar."""
+        priorities = (np.abs(td_errors) + self.eps) ** self.priority_exponent
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+        self.tree.update(slots, priorities)
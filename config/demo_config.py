@@ -5,7 +5,68 @@ Bu modül, fabrika ortamının tüm parametrelerini içerir. Makine sayıları,
 operatör becerileri, ödül parametreleri vs. burada tanımlanıyor.
 """
 
+import functools
+import types
 
+import numpy as np
+
+
+def _frozen(values, dtype) -> np.ndarray:
+    """Listeyi verilen tipte NumPy dizisine çevirip salt-okunur yapar (yanlışlıkla değiştirilmesin)."""
+    arr = np.array(values, dtype=dtype)
+    arr.flags.writeable = False
+    return arr
+
+
+# Beceri matrisi: her makine tipinde operatör becerisi
+# Şekil: (num_operators, num_machines)
+# Değerler 0.1 (çok kötü) ile 1.0 (mükemmel) arasında
+# Daha çeşitli beceri seviyeleri: uzman, iyi, orta, kötü, çok kötü
+# float64 bilerek: 0.70 float32'de 0.7'nin hemen altına düşüyor ve beceri eşiklerini (0.3/0.7) bozuyor
+SKILL_MATRIX = _frozen([
+    [0.95, 0.35, 0.15, 0.20],  # Operatör 0: pres'te uzman, diğerlerinde çok kötü
+    [0.25, 0.90, 0.65, 0.55],  # Operatör 1: tornada uzman, diğerlerinde orta-kötü
+    [0.55, 0.30, 0.95, 0.85],  # Operatör 2: kaynakta uzman, paketlemede iyi
+    [0.45, 0.50, 0.48, 0.52],  # Operatör 3: tüm makinelerde ortalama (çok yönlü)
+    [0.70, 0.65, 0.55, 0.92],  # Operatör 4: paketlemede uzman, diğerlerinde iyi
+    [0.88, 0.58, 0.42, 0.68],  # Operatör 5: pres'te çok iyi, diğerlerinde orta-iyi
+], dtype=np.float64)
+
+# Operatör vardiya kapasitesi: operatör başına vardiya başına maksimum çalışma dakikası
+# Şekil: (num_operators, num_shifts)
+# Bazı operatörler "daha güçlü" (yüksek kapasite), bazıları yarı zamanlı veya daha zayıf
+# Kapasiteyi yaklaşık %20 artırdık (vardiya başına ~60 dakika ekleyerek) böylece fabrika
+# fiziksel olarak günde daha fazla parça üretebilir, RL ajanının daha yüksek üretim seviyelerine
+# ulaşmasına izin verir
+OP_SHIFT_CAP = _frozen([
+    [480, 460, 480],  # Operatör 0: güçlü, vardiyalar arasında tutarlı (420'den artırıldı)
+    [460, 480, 460],  # Operatör 1: güçlü, orta vardiyada biraz daha iyi (400'den artırıldı)
+    [440, 420, 440],  # Operatör 2: orta kapasite, orta vardiyada daha zayıf (380/360'dan artırıldı)
+    [460, 460, 460],  # Operatör 3: tutarlı ortalama kapasite (400'den artırıldı)
+    [480, 440, 480],  # Operatör 4: güçlü, ama orta vardiyada daha zayıf (420/380'den artırıldı)
+    [470, 450, 470],  # Operatör 5: güçlü, tutarlı kapasite
+], dtype=np.int32)
+
+# Her makine tipi için temel işlem süreleri (parça başına dakika): pres, torna, kaynak, paketleme
+BASE_PROCESS_TIMES = _frozen([6.0, 7.0, 9.0, 5.0], dtype=np.float32)
+
+# Her makine tipi için asgari parça işleme süreleri (dakika): pres, torna, kaynak, paketleme
+MIN_PROCESS_TIMES = _frozen([10.0, 45.0, 75.0, 25.0], dtype=np.float32)
+
+# Operatör x makine tipi için gerçek işlem süresi: max(temel_süre / beceri, asgari_süre)
+# Şekil: (num_operators, num_machines). Tablolar sabit olduğu için bir kez hesaplıyorum;
+# ortam her atamada bölme + max yerine buradan okuyor. Beceri 0.1'in altına inmiyor
+# (ortamdaki max(skill, 0.1) ile aynı). float64 tutuyorum ki ortamın eski hesabıyla birebir aynı çıksın.
+EFFECTIVE_PROCESS_TIME = _frozen(
+    np.maximum(
+        BASE_PROCESS_TIMES[None, :] / np.maximum(SKILL_MATRIX, 0.1),
+        MIN_PROCESS_TIMES[None, :],
+    ),
+    dtype=np.float64,
+)
+
+
+@functools.lru_cache(maxsize=1)
 def get_demo_config():
     """
     Fabrika simülasyonu için demo yapılandırmasını döndürür.
@@ -14,8 +75,15 @@ def get_demo_config():
     bir fabrika gününü destekler. Fabrika tam bir gün (3 vardiya) çalışır,
     sonra sıfırlanır.
     
+    Sayısal tablolar (beceri matrisi, kapasiteler, işlem süreleri) modül yüklenirken
+    bir kez salt-okunur NumPy dizilerine çevriliyor; sözlüğe kopyaları değil,
+    referansları konuyor.
+    
+    Sonuç önbelleğe alınıyor; her çağrı aynı salt-okunur nesneyi döndürüyor.
+    Değiştirmek isteyen çağıran taraf kopyasını almalı: dict(get_demo_config()).
+    
     Returns:
-        Tüm yapılandırma parametrelerini içeren sözlük
+        Tüm yapılandırma parametrelerini içeren salt-okunur eşleme (MappingProxyType)
     """
     num_machines = 4
     num_operators = 6  # Daha iyi makine kullanımı için 6 operatör
@@ -23,34 +91,6 @@ def get_demo_config():
     shift_length_minutes = 480  # Her vardiya 8 saat
     day_duration_minutes = num_shifts * shift_length_minutes  # Tam gün = 3 vardiya
     
-    # Beceri matrisi: her makine tipinde operatör becerisi
-    # Şekil: (num_operators, num_machines)
-    # Değerler 0.1 (çok kötü) ile 1.0 (mükemmel) arasında
-    # Daha çeşitli beceri seviyeleri: uzman, iyi, orta, kötü, çok kötü
-    skill_matrix = [
-        [0.95, 0.35, 0.15, 0.20],  # Operatör 0: pres'te uzman, diğerlerinde çok kötü
-        [0.25, 0.90, 0.65, 0.55],  # Operatör 1: tornada uzman, diğerlerinde orta-kötü
-        [0.55, 0.30, 0.95, 0.85],  # Operatör 2: kaynakta uzman, paketlemede iyi
-        [0.45, 0.50, 0.48, 0.52],  # Operatör 3: tüm makinelerde ortalama (çok yönlü)
-        [0.70, 0.65, 0.55, 0.92],  # Operatör 4: paketlemede uzman, diğerlerinde iyi
-        [0.88, 0.58, 0.42, 0.68],  # Operatör 5: pres'te çok iyi, diğerlerinde orta-iyi
-    ]
-    
-    # Operatör vardiya kapasitesi: operatör başına vardiya başına maksimum çalışma dakikası
-    # Şekil: (num_operators, num_shifts)
-    # Bazı operatörler "daha güçlü" (yüksek kapasite), bazıları yarı zamanlı veya daha zayıf
-    # Kapasiteyi yaklaşık %20 artırdık (vardiya başına ~60 dakika ekleyerek) böylece fabrika
-    # fiziksel olarak günde daha fazla parça üretebilir, RL ajanının daha yüksek üretim seviyelerine
-    # ulaşmasına izin verir
-    operator_shift_capacity_minutes = [
-        [480, 460, 480],  # Operatör 0: güçlü, vardiyalar arasında tutarlı (420'den artırıldı)
-        [460, 480, 460],  # Operatör 1: güçlü, orta vardiyada biraz daha iyi (400'den artırıldı)
-        [440, 420, 440],  # Operatör 2: orta kapasite, orta vardiyada daha zayıf (380/360'dan artırıldı)
-        [460, 460, 460],  # Operatör 3: tutarlı ortalama kapasite (400'den artırıldı)
-        [480, 440, 480],  # Operatör 4: güçlü, ama orta vardiyada daha zayıf (420/380'den artırıldı)
-        [470, 450, 470],  # Operatör 5: güçlü, tutarlı kapasite
-    ]
-    
     config = {
         # Temel fabrika parametreleri
         "num_machines": num_machines,  # Fabrikadaki makine sayısı
@@ -66,27 +106,27 @@ def get_demo_config():
         "target_production": 90,  # Geriye dönük uyumluluk için takma ad (artık günlük hedefi temsil ediyor, vardiya başına değil)
         
         # Makine yapılandırması
-        "machine_types": ["press", "lathe", "welding", "packing"],  # Makine tipleri
-        "machine_priorities": [1, 2, 1, 0],  # Makine başına öncelik seviyeleri (0=düşük, 1=orta, 2=yüksek)
+        "machine_types": ("press", "lathe", "welding", "packing"),  # Makine tipleri
+        "machine_priorities": (1, 2, 1, 0),  # Makine başına öncelik seviyeleri (0=düşük, 1=orta, 2=yüksek)
         # Daha yüksek öncelikli makinelere önce operatör atanmalı
         
         # Operatör beceri matrisi
         # skill_matrix[i][j] = operatör i'nin makine tipi j'deki becerisi
         # Yüksek beceri daha hızlı işleme ve daha düşük hata oranı anlamına gelir
-        "skill_matrix": skill_matrix,
+        "skill_matrix": SKILL_MATRIX,
         
         # Vardiya başına operatör kapasitesi
         # operator_shift_capacity_minutes[i][j] = operatör i için vardiya j'de maksimum çalışma dakikası
         # Kapasiteyi aşmak yorgunluk cezalarına yol açar
         # Bazı operatörler daha güçlüdür (yüksek kapasite), bazıları yarı zamanlıdır (belirli vardiyalarda düşük kapasite)
-        "operator_shift_capacity_minutes": operator_shift_capacity_minutes,
+        "operator_shift_capacity_minutes": OP_SHIFT_CAP,
         
         # Her makine tipi için temel işlem süreleri (parça başına dakika)
         # Gerçek işlem süresi = temel_süre / operatör_becerisi
         # Not: Aşağıdaki minimum işlem süreleri ile birlikte kullanılır; böylece
         # beceri ne kadar yüksek olursa olsun bir parçanın işlenmesi fiziksel
         # olarak belirli bir süreden daha kısa sürmez.
-        "base_process_times": [6.0, 7.0, 9.0, 5.0],  # pres, torna, kaynak, paketleme
+        "base_process_times": BASE_PROCESS_TIMES,  # pres, torna, kaynak, paketleme
 
         # Her makine tipi için **asgari parça işleme süreleri** (dakika cinsinden)
         # Bu projenin senaryosuna göre minimum süreler:
@@ -103,7 +143,11 @@ def get_demo_config():
         #
         # Yani, operatör becerisi ne kadar yüksek olursa olsun, ilgili makinede
         # bir parçayı bu süreden daha hızlı işleyemez.
-        "min_process_times": [10.0, 45.0, 75.0, 25.0],
+        "min_process_times": MIN_PROCESS_TIMES,
+
+        # Önceden hesaplanmış gerçek işlem süresi tablosu (operatör x makine tipi)
+        # effective_process_time[i][j] = max(base_process_times[j] / skill_matrix[i][j], min_process_times[j])
+        "effective_process_time": EFFECTIVE_PROCESS_TIME,
         
         # Makine arıza/bakım parametreleri
         "machine_breakdown_probability": 0.02,  # Her işlem sonrası arıza olasılığı (2%)
@@ -122,7 +166,7 @@ def get_demo_config():
         # - Erken episode'larda (politika kötü iken) toplam ödül nispeten düşük kalsın,
         # - İlerleyen episode'larda ajan hedefe daha çok yaklaştıkça ekstra bonuslar
         #   devreye girsin ve return grafiği yukarı doğru çıksın.
-        "reward_params": {
+        "reward_params": types.MappingProxyType({
             # Üretilen her iyi parça için pozitif ödül
             # Orta seviyede tuttum; tek başına çok büyük sıçrama yaratmasın diye.
             "reward_per_good_part": 2.0,
@@ -178,7 +222,7 @@ def get_demo_config():
             "penalty_machine_idle": 10.0,  # Makine boş kalma cezası
             # Her başarılı (sağlam) ürün üretiminde ek ödül (parça başına ödüle ek)
             "reward_successful_part": 1.0,
-        }
+        }),
     }
     
-    return config
+    return types.MappingProxyType(config)
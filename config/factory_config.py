@@ -0,0 +1,112 @@
+"""
+Fabrika ortamı için tipli, değiştirilemez yapılandırma.
+
+FactoryEnv eskiden her oluşturulduğunda config sözlüğünden ~25 anahtar okuyup
+dizileri yeniden kuruyordu. FactoryConfig bu işi bir kez yapıyor; aynı nesne
+birden fazla ortama verilirse (paralel eğitim gibi) beceri matrisi, işlem süresi
+tabloları vs. tüm ortamlar arasında kopyalanmadan paylaşılıyor. Diziler bu
+yüzden salt-okunur.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Mapping, Tuple
+
+import numpy as np
+
+
+def _shared(values, dtype=None) -> np.ndarray:
+    """Diziyi (gerekirse) verilen tipe çevirip salt-okunur yapar; tip zaten uygunsa kopyalamaz."""
+    arr = np.ascontiguousarray(values, dtype=dtype)
+    if arr.flags.writeable:
+        if arr is values:
+            # Çağıranın kendi dizisini kilitlemeyelim
+            arr = arr.copy()
+        arr.flags.writeable = False
+    return arr
+
+
+@dataclass(frozen=True, slots=True)
+class FactoryConfig:
+    """
+    FactoryEnv'in okuduğu tüm ayarlar, varsayılanları uygulanmış halde.
+
+    Sözlükten kurmak için from_dict kullanılıyor; anahtar isimleri ve varsayılanlar
+    demo_config'teki sözlükle aynı.
+    """
+
+    num_machines: int
+    num_operators: int
+    num_shifts: int
+    shift_length_minutes: float
+    day_duration_minutes: float
+    target_production_per_day: int
+    target_production: int
+    machine_types: Tuple[str, ...]
+    machine_priorities: Tuple[int, ...]
+    # float64 bilerek: float32'de 0.70 gibi değerler 0.7 eşiğinin altına düşüyor (bkz. demo_config)
+    skill_matrix: np.ndarray
+    base_process_times: np.ndarray
+    min_process_times: np.ndarray
+    effective_process_time: np.ndarray
+    operator_shift_capacity_minutes: np.ndarray
+    reward_params: Mapping[str, float]
+    machine_breakdown_probability: float = 0.02
+    machine_maintenance_probability: float = 0.01
+    max_breakdown_duration_shifts: float = 2
+    max_maintenance_duration_shifts: float = 2
+    min_breakdown_duration_minutes: float = 60
+    min_maintenance_duration_minutes: float = 30
+    fatigue_threshold_ratio: float = 0.8
+    fatigue_penalty_scale: float = 0.5
+
+    @classmethod
+    def from_dict(cls, config: Mapping[str, Any]) -> "FactoryConfig":
+        """
+        get_demo_config() biçimindeki bir sözlükten FactoryConfig kurar.
+
+        min_process_times yoksa base_process_times, effective_process_time yoksa
+        max(temel_süre / max(beceri, 0.1), asgari_süre) kullanılıyor.
+        """
+        skill_matrix = _shared(config["skill_matrix"], np.float64)
+        base_process_times = _shared(config["base_process_times"], np.float32)
+        min_process_times = _shared(config.get("min_process_times", config["base_process_times"]), np.float32)
+        if "effective_process_time" in config:
+            effective_process_time = _shared(config["effective_process_time"], np.float64)
+        else:
+            effective_process_time = _shared(np.maximum(
+                base_process_times[None, :] / np.maximum(skill_matrix, 0.1),
+                min_process_times[None, :],
+            ))
+
+        optional = {
+            name: config[name]
+            for name in (
+                "machine_breakdown_probability",
+                "machine_maintenance_probability",
+                "max_breakdown_duration_shifts",
+                "max_maintenance_duration_shifts",
+                "min_breakdown_duration_minutes",
+                "min_maintenance_duration_minutes",
+                "fatigue_threshold_ratio",
+                "fatigue_penalty_scale",
+            )
+            if name in config
+        }
+        return cls(
+            num_machines=config["num_machines"],
+            num_operators=config["num_operators"],
+            num_shifts=config["num_shifts"],
+            shift_length_minutes=config["shift_length_minutes"],
+            day_duration_minutes=config["day_duration_minutes"],
+            target_production_per_day=config["target_production_per_day"],
+            target_production=config.get("target_production", config["target_production_per_day"]),
+            machine_types=tuple(config["machine_types"]),
+            machine_priorities=tuple(config["machine_priorities"]),
+            skill_matrix=skill_matrix,
+            base_process_times=base_process_times,
+            min_process_times=min_process_times,
+            effective_process_time=effective_process_time,
+            operator_shift_capacity_minutes=_shared(config["operator_shift_capacity_minutes"]),
+            reward_params=config["reward_params"],
+            **optional,
+        )
@@ -0,0 +1,216 @@
+"""
+FactoryEnv'in sıcak döngüsündeki sayısal kısımlar için derlenmiş çekirdekler.
+
+Fonksiyonlar self'e dokunmuyor; tüm dizileri ve parametreleri argüman olarak alıyor.
+Böylece Numba her fonksiyonu bir kez derliyor (cache=True ile diske de yazılıyor)
+ve ortam sınıfı sadece ince bir sarmalayıcı olarak kalıyor. Numba kurulu değilse
+aynı fonksiyonlar düz Python olarak çalışıyor.
+"""
+
+from utils.jit import njit
+
+
+# Makine durum kodları (durum tuple'ındaki kodlarla aynı)
+MACHINE_IDLE = 0
+MACHINE_BUSY = 1
+MACHINE_BROKEN = 2
+MACHINE_MAINTENANCE = 3
+
+# Operatör durum kodları
+OPERATOR_IDLE = 0
+OPERATOR_BUSY = 1
+
+# finish_work_kernel'in params dizisindeki sıralama
+FINISH_FATIGUE_THRESHOLD = 0
+FINISH_FATIGUE_PENALTY_SCALE = 1
+FINISH_PENALTY_OVER_CAPACITY = 2
+FINISH_REWARD_APPROPRIATE = 3
+FINISH_PENALTY_SLOW = 4
+FINISH_PENALTY_MISMATCH = 5
+FINISH_REWARD_SKILL_SCALE = 6
+# finish_part_kernel'in parça sonucu için ek parametreleri (aynı dizide)
+FINISH_PENALTY_DEFECTIVE = 7
+FINISH_REWARD_PER_GOOD_PART = 8
+FINISH_REWARD_SUCCESSFUL_PART = 9
+FINISH_BONUS_50 = 10
+FINISH_BONUS_80 = 11
+NUM_FINISH_PARAMS = 12
+
+
+@njit(cache=True)
+def finish_work_kernel(
+    reward,
+    operator_id,
+    machine_type_idx,
+    shift_idx,
+    skill_matrix,
+    effective_process_time,
+    work_minutes,
+    capacity_minutes,
+    fatigue_level,
+    params,
+):
+    """
+    Bir makinede parça bittiğinde operatörün iş yükünü ve ödülün beceri kısmını günceller.
+
+    Sırasıyla: çalışma dakikası eklenir, yorgunluk ve kapasite aşımı cezaları düşülür,
+    beceri seviyesine göre (>=0.7 uygun, <0.3 uygunsuz, arası orta) ödül/ceza eklenir.
+    work_minutes ve fatigue_level yerinde değişir. Sabit parametreler tek bir float64
+    dizisinde geliyor (sıralama yukarıdaki FINISH_* indeksleri); çağrı başına argüman
+    sayısı az kalsın diye.
+
+    Returns:
+        (güncel ödül, operatörün bu makine tipindeki becerisi)
+    """
+    fatigue_threshold_ratio = params[FINISH_FATIGUE_THRESHOLD]
+    skill = skill_matrix[operator_id, machine_type_idx]
+
+    # Operatör çalışma süresini takip et (asgari işlem süresini dikkate al)
+    work_minutes[operator_id, shift_idx] += effective_process_time[operator_id, machine_type_idx]
+    capacity = capacity_minutes[operator_id, shift_idx]
+    worked = work_minutes[operator_id, shift_idx]
+
+    # Yorgunluk: kapasitenin fatigue_threshold_ratio kadarı aşılınca başlıyor (0.0 - 1.0)
+    if capacity > 0:
+        usage_ratio = worked / capacity
+        if usage_ratio >= fatigue_threshold_ratio:
+            fatigue = min(1.0, (usage_ratio - fatigue_threshold_ratio) / (1.0 - fatigue_threshold_ratio))
+            fatigue_level[operator_id] = fatigue
+            if fatigue > 0:
+                reward -= params[FINISH_FATIGUE_PENALTY_SCALE] * fatigue
+
+    # Kapasite aşımı cezası, aşım oranına göre
+    if worked > capacity:
+        reward -= params[FINISH_PENALTY_OVER_CAPACITY] * ((worked - capacity) / capacity)
+
+    # Beceri bazlı ödüller
+    if skill >= 0.7:
+        reward += params[FINISH_REWARD_APPROPRIATE]
+    elif skill < 0.3:
+        # Düşük beceri = uygunsuz eşleşme, yavaş üretim
+        reward -= params[FINISH_PENALTY_SLOW]
+        reward -= params[FINISH_PENALTY_MISMATCH]
+    else:
+        reward += params[FINISH_REWARD_SKILL_SCALE] * skill
+
+    return reward, skill
+
+
+@njit(cache=True)
+def finish_part_kernel(
+    reward,
+    defect_u,
+    operator_id,
+    machine_type_idx,
+    shift_idx,
+    skill_matrix,
+    effective_process_time,
+    work_minutes,
+    capacity_minutes,
+    fatigue_level,
+    params,
+    produced,
+    target,
+    reached_50,
+    reached_80,
+):
+    """
+    Bir parçanın bitişini baştan sona hesaplar: finish_work_kernel + hata zarı + üretim ödülleri.
+
+    Hata olasılığı max(0, 0.5 - beceri); zar (defect_u, [0, 1) uniform) çağıran tarafta
+    ortamın RNG'sinden çekiliyor ki çekirdek deterministik kalsın. Sağlam parçada parça
+    ödülleri eklenir, sayaç artar ve hedefin %50 / %80'i ilk kez geçilince bonus verilir.
+
+    Returns:
+        (güncel ödül, güncel sağlam parça sayısı, reached_50, reached_80)
+    """
+    reward, skill = finish_work_kernel(
+        reward,
+        operator_id,
+        machine_type_idx,
+        shift_idx,
+        skill_matrix,
+        effective_process_time,
+        work_minutes,
+        capacity_minutes,
+        fatigue_level,
+        params,
+    )
+
+    if defect_u < max(0.0, 0.5 - skill):
+        # Hatalı ürün cezası
+        reward -= params[FINISH_PENALTY_DEFECTIVE]
+        return reward, produced, reached_50, reached_80
+
+    # Başarılı ürün üretimi
+    reward += params[FINISH_REWARD_PER_GOOD_PART]
+    reward += params[FINISH_REWARD_SUCCESSFUL_PART]
+    produced += 1
+
+    # Kilometre taşı bonusları (bölüm başına bir kez)
+    if not reached_50 and produced >= 0.5 * target:
+        reward += params[FINISH_BONUS_50]
+        reached_50 = True
+    if not reached_80 and produced >= 0.8 * target:
+        reward += params[FINISH_BONUS_80]
+        reached_80 = True
+
+    return reward, produced, reached_50, reached_80
+
+
+@njit(cache=True)
+def autofill_kernel(
+    idle_machines,
+    skill_rank,
+    machine_type_index,
+    effective_process_time,
+    machine_op,
+    machine_status,
+    operator_status,
+    operator_machine,
+    machine_time_remaining,
+    machine_assign_seq,
+    assign_counter,
+):
+    """
+    Boş makinelere (öncelik sırasıyla) en yüksek becerili müsait operatörü atar.
+
+    skill_rank[:, t], t tipindeki makine için operatörlerin beceriye göre azalan sırası.
+    Her makine için bu sırada müsait olan ilk operatör seçiliyor; kullanılan operatör
+    operator_status üzerinden meşgul işaretlendiği için ayrı bir liste tutmaya gerek yok.
+    Müsait operatör kalmayınca duruyor. Diziler yerinde değişir.
+
+    Returns:
+        Güncel atama sayacı (machine_assign_seq için)
+    """
+    num_operators = skill_rank.shape[0]
+    num_available = 0
+    for op_id in range(num_operators):
+        if operator_status[op_id] == OPERATOR_IDLE:
+            num_available += 1
+
+    for i in range(idle_machines.shape[0]):
+        if num_available == 0:
+            break
+        m_id = idle_machines[i]
+        machine_type_idx = machine_type_index[m_id]
+
+        best_op = -1
+        for r in range(num_operators):
+            op_id = skill_rank[r, machine_type_idx]
+            if operator_status[op_id] == OPERATOR_IDLE:
+                best_op = op_id
+                break
+
+        machine_op[m_id] = best_op
+        machine_status[m_id] = MACHINE_BUSY
+        operator_machine[best_op] = m_id
+        operator_status[best_op] = OPERATOR_BUSY
+        num_available -= 1
+
+        # İşlem süresini başlat (asgari süre tabloya dahil)
+        machine_time_remaining[m_id] = effective_process_time[best_op, machine_type_idx]
+        assign_counter += 1
+        machine_assign_seq[m_id] = assign_counter
+
+    return assign_counter
@@ -7,8 +7,39 @@ işleyebilmesi için operatör atanması gerekiyor ve operatörlerin de vardiya
 politika öğreniyor.
 """
 
+import bisect
+
 import numpy as np
-from typing import Tuple, Dict, Any, Optional, List
+from typing import Tuple, Dict, Any, Optional, List, Mapping, Union
+
+from config.factory_config import FactoryConfig
+from env._factory_kernels import (
+    MACHINE_IDLE,
+    MACHINE_BUSY,
+    MACHINE_BROKEN,
+    MACHINE_MAINTENANCE,
+    OPERATOR_IDLE,
+    OPERATOR_BUSY,
+    autofill_kernel,
+    finish_part_kernel,
+    FINISH_FATIGUE_THRESHOLD,
+    FINISH_FATIGUE_PENALTY_SCALE,
+    FINISH_PENALTY_OVER_CAPACITY,
+    FINISH_REWARD_APPROPRIATE,
+    FINISH_PENALTY_SLOW,
+    FINISH_PENALTY_MISMATCH,
+    FINISH_REWARD_SKILL_SCALE,
+    FINISH_PENALTY_DEFECTIVE,
+    FINISH_REWARD_PER_GOOD_PART,
+    FINISH_REWARD_SUCCESSFUL_PART,
+    FINISH_BONUS_50,
+    FINISH_BONUS_80,
+    NUM_FINISH_PARAMS,
+)
+
+
+# Makine durum kodlarının (MACHINE_IDLE..MACHINE_MAINTENANCE) isimleri; history ve görselleştirme için
+MACHINE_STATUS_NAMES = ("idle", "busy", "broken", "maintenance")
 
 
 class FactoryEnv:
@@ -20,85 +51,182 @@ class FactoryEnv:
     Operatörlerin vardiya başına kapasite sınırı ve yorgunluk etkisi de işin içinde.
     """
     
-    def __init__(self, config: dict, seed: Optional[int] = None):
+    def __init__(self, config: Union[Mapping[str, Any], FactoryConfig], seed: Optional[int] = None):
         """
         Ortamı başlatıyorum.
 
-        Burada config sözlüğünden tüm fabrika ayarlarını (makine sayısı,
-        operatör sayısı, vardiya süresi, ödül parametreleri vs.) okuyorum.
+        Tüm fabrika ayarlarını (makine sayısı, operatör sayısı, vardiya süresi, ödül
+        parametreleri vs.) bir FactoryConfig'ten okuyorum. Sözlük verilirse (eski kullanım)
+        önce FactoryConfig.from_dict ile çevriliyor; çok sayıda ortam kurulacaksa aynı
+        FactoryConfig'i vermek tablo dizilerinin ortamlar arasında paylaşılmasını sağlıyor.
         İstenirse seed vererek aynı senaryoyu tekrar üretmek mümkün.
         """
         self.config = config
-        self.rng = np.random.RandomState(seed) if seed is not None else np.random
-        
-        # Yapılandırma parametrelerini çıkar
-        self.num_machines = config["num_machines"]
-        self.num_operators = config["num_operators"]
-        self.num_shifts = config["num_shifts"]
-        self.shift_length_minutes = config["shift_length_minutes"]
-        self.day_duration_minutes = config["day_duration_minutes"]
-        self.target_production_per_day = config["target_production_per_day"]
-        self.target_production = config.get("target_production", self.target_production_per_day)  # Uyumluluk için
-        self.machine_types = config["machine_types"]
-        self.machine_priorities = config["machine_priorities"]
-        self.skill_matrix = np.array(config["skill_matrix"])
-        self.base_process_times = np.array(config["base_process_times"], dtype=np.float32)
+        cfg = config if isinstance(config, FactoryConfig) else FactoryConfig.from_dict(config)
+        self.cfg = cfg
+        # PCG64 tabanlı yeni Generator; eski RandomState'ten (Mersenne Twister) hızlı.
+        # seed None ise işletim sisteminden rastgele bir tohum alıyor.
+        self.rng = np.random.default_rng(seed)
+        
+        # Yapılandırma parametrelerini çıkar (diziler kopyalanmıyor, cfg ile paylaşılıyor)
+        self.num_machines = cfg.num_machines
+        self.num_operators = cfg.num_operators
+        self.num_shifts = cfg.num_shifts
+        self.shift_length_minutes = cfg.shift_length_minutes
+        self.day_duration_minutes = cfg.day_duration_minutes
+        self.target_production_per_day = cfg.target_production_per_day
+        self.target_production = cfg.target_production  # Uyumluluk için
+        self.machine_types = cfg.machine_types
+        self.machine_priorities = cfg.machine_priorities
+        self.skill_matrix = cfg.skill_matrix
+        self.base_process_times = cfg.base_process_times
         # Her makine tipi için asgari parça işleme süresi (dakika)
-        # Config'de tanımlı değilse, varsayılan olarak base_process_times kullanılır.
-        self.min_process_times = np.array(
-            config.get("min_process_times", config["base_process_times"]),
-            dtype=np.float32,
-        )
-        self.reward_params = config["reward_params"]
+        self.min_process_times = cfg.min_process_times
+        # Gerçek işlem süresi tablosu (operatör x makine tipi)
+        self.effective_process_time = cfg.effective_process_time
+        self.reward_params = cfg.reward_params
         
         # Operatör kapasitesi vardiya başına: şekil (num_operators, num_shifts)
-        self.operator_shift_capacity_minutes = np.array(config["operator_shift_capacity_minutes"])
+        self.operator_shift_capacity_minutes = cfg.operator_shift_capacity_minutes
         
         # Makine arıza/bakım parametreleri
-        self.breakdown_prob = config.get("machine_breakdown_probability", 0.02)
-        self.maintenance_prob = config.get("machine_maintenance_probability", 0.01)
-        self.max_breakdown_shifts = config.get("max_breakdown_duration_shifts", 2)
-        self.max_maintenance_shifts = config.get("max_maintenance_duration_shifts", 2)
-        self.min_breakdown_minutes = config.get("min_breakdown_duration_minutes", 60)
-        self.min_maintenance_minutes = config.get("min_maintenance_duration_minutes", 30)
+        self.breakdown_prob = cfg.machine_breakdown_probability
+        self.maintenance_prob = cfg.machine_maintenance_probability
+        self.max_breakdown_shifts = cfg.max_breakdown_duration_shifts
+        self.max_maintenance_shifts = cfg.max_maintenance_duration_shifts
+        self.min_breakdown_minutes = cfg.min_breakdown_duration_minutes
+        self.min_maintenance_minutes = cfg.min_maintenance_duration_minutes
         
         # Operatör yorgunluk parametreleri
-        self.fatigue_threshold_ratio = config.get("fatigue_threshold_ratio", 0.8)
-        self.fatigue_penalty_scale = config.get("fatigue_penalty_scale", 0.5)
+        self.fatigue_threshold_ratio = cfg.fatigue_threshold_ratio
+        self.fatigue_penalty_scale = cfg.fatigue_penalty_scale
+
+        # Durum kovaları için eşikler. bisect_left(eşikler, x) = x'ten küçük eşik sayısı,
+        # yani eski if/elif zincirindeki "<= eşik" karşılaştırmalarıyla aynı kova.
+        self._time_thresholds = [0.0, self.day_duration_minutes / 4, self.day_duration_minutes / 2]
+        self._gap_thresholds = [0, 30, 60]
+        # Beceri kovaları (0: <0.3 düşük, 1: <0.7 orta, 2: yüksek) beceri matrisi sabit olduğu için
+        # makine tipi başına bir kez hesaplanıyor. float64 eşik: 0.70 tam 0.7 kovasına düşsün.
+        # Durumda operatör başına kovalar tuple olarak değil, tek bir tamsayıya 3 tabanında
+        # paketlenmiş halde duruyor: anahtar = sum(kova[i] * 3**i)
+        skill_buckets = np.searchsorted(np.array([0.3, 0.7]), self.skill_matrix, side="right")
+        base3 = 3 ** np.arange(self.num_operators, dtype=np.int64)
+        self._skill_key_by_type = (base3 @ skill_buckets).tolist()
+        # Operatör müsaitliği de bit maskesi: i. bit = operatör i boşta (64 operatöre kadar)
+        self._operator_bits = 1 << np.arange(self.num_operators, dtype=np.uint64)
+        # Makine tipi başına operatörlerin beceriye göre azalan sırası (eşitlikte küçük indeks önce);
+        # otomatik atamada en iyi müsait operatörü bulmak için her seferinde tüm becerileri taramıyoruz
+        self._skill_rank = np.argsort(-self.skill_matrix, axis=0, kind="stable")
+
+        # Ödül parametreleri: parça bitişi çekirdeğinin dizisi ve step'te kullanılan skalerler
+        self._finish_params = np.zeros(NUM_FINISH_PARAMS, dtype=np.float64)
+        self._refresh_reward_params()
         
         # Durum takibi
+        # Makineler ve operatörler sözlük listesi yerine paralel NumPy dizilerinde (SoA) tutuluyor:
+        # her alan için ayrı, makine/operatör indeksiyle erişilen küçük bir dizi.
         self.current_time_minutes = 0.0
-        self.machines = []
-        self.operators = []
+        self._current_shift_index = 0  # Zaman ilerledikçe _advance_time güncelliyor
+        # _get_state önbelleği: makine/operatör dizilerini değiştiren her yer _state_dirty'yi açıyor
+        self._state_dirty = True
+        self._cached_state: Optional[Tuple] = None
+        self._cached_state_key: Optional[Tuple] = None
+        # Makine tipi ve önceliği sabit; bir kez hesaplıyorum
+        self.machine_type_index = np.array(
+            [i % len(self.machine_types) for i in range(self.num_machines)], dtype=np.int8
+        )
+        self.machine_priority = np.array(
+            [self.machine_priorities[i] if i < len(self.machine_priorities) else 0 for i in range(self.num_machines)],
+            dtype=np.int8,
+        )
+        # _get_state her adımda NumPy skaleri kutulamasın diye makine başına hazır Python listeleri
+        self._priority_by_machine = self.machine_priority.tolist()
+        self._skill_key_by_machine = [self._skill_key_by_type[t] for t in self.machine_type_index.tolist()]
+        self.machine_status = np.full(self.num_machines, MACHINE_IDLE, dtype=np.int8)
+        self._busy_count = 0  # MACHINE_BUSY durumundaki makine sayısı (her atama/serbest bırakmada güncelleniyor)
+        self._down_count = 0  # Arıza/bakımdaki makine sayısı
+        self.machine_op = np.full(self.num_machines, -1, dtype=np.int16)  # -1: operatör yok
+        self.operator_status = np.full(self.num_operators, OPERATOR_IDLE, dtype=np.int8)
+        self.operator_machine = np.full(self.num_operators, -1, dtype=np.int16)  # -1: makine yok
         self.produced_good_parts = 0
         self.current_machine_id = None
         
         # Tüm meşgul makinelerin işlem sürelerini takip et (paralel işlem için)
-        self.machine_processing_remaining = {}  # machine_id -> kalan_süre
+        # Sözlük yerine makine başına dizi: np.inf = makine işlem yapmıyor
+        self.machine_time_remaining = np.full(self.num_machines, np.inf, dtype=np.float64)
+        # Atama sırası: aynı anda biten makineleri atanma sırasıyla işlemek için
+        # (eski sözlüğün ekleme sırasıyla aynı; rastgele çekimlerin sırası değişmesin)
+        self.machine_assign_seq = np.zeros(self.num_machines, dtype=np.int32)
+        self._assign_counter = 0
         
-        # Operatör değiştirme maliyeti için her makinedeki son operatörü takip et
-        self.last_operator_per_machine = [None] * self.num_machines
+        # Operatör değiştirme maliyeti için her makinedeki son operatörü takip et (-1: henüz atanmadı)
+        self.last_operator_per_machine = np.full(self.num_machines, -1, dtype=np.int16)
         
         # Operatör çalışma süresi takibi vardiya başına: şekil (num_operators, num_shifts)
         self.operator_work_minutes_per_shift = np.zeros((self.num_operators, self.num_shifts), dtype=np.float32)
         
         # Görselleştirme için history kaydı
         self.record_history: bool = False
-        self.history_frames: List[Dict[str, Any]] = []
         self.last_history_time: float = 0.0  # Son history kaydı zamanı
         self.history_interval_minutes: float = 0.5  # History kaydı aralığı (dakika) - paralel işlemeyi görmek için çok sık
+        # Ham snapshot'lar önceden ayrılmış yapılandırılmış bir dizide (frame başına bir kayıt);
+        # okumak için get_history(). Zaman float64: GIF'teki saat eskisiyle birebir aynı kalsın.
+        self._history_dtype = np.dtype([
+            ("time", np.float64),
+            ("shift_index", np.int8),
+            ("produced", np.uint32),
+            ("machine_op", np.int16, (self.num_machines,)),
+            ("machine_status", np.int8, (self.num_machines,)),
+        ])
+        self.history_frames = np.empty(0, dtype=self._history_dtype)
+        self._frame_idx = 0
+        # Verilirse history en fazla bu kadar frame tutuyor: dolunca eldekiler ikide bire
+        # seyreltilip kayıt adımı ikiye katlanıyor (None: sınır yok, her snapshot saklanır)
+        self.history_max_frames: Optional[int] = None
+        self._history_stride = 1
+        self._snapshot_count = 0
         
         # Ödül şekillendirme için kilometre taşı takibi
         self.reached_50_percent = False
         self.reached_80_percent = False
         
-        # Makine arıza/bakım takibi
-        # Her makine için: {"status": "idle"/"busy"/"broken"/"maintenance", "down_until": dakika}
-        self.machine_down_until = [None] * self.num_machines  # None veya dakika cinsinden bitiş zamanı
+        # Makine arıza/bakım takibi: arıza/bakımın biteceği dakika, makine çalışır durumdaysa -inf.
+        # Böylece "makine kapalı mı" testi None kontrolü olmadan tek bir karşılaştırma oluyor.
+        self.machine_down_until = np.full(self.num_machines, -np.inf, dtype=np.float64)
         
         # Operatör yorgunluk takibi
         self.operator_fatigue_level = np.zeros(self.num_operators, dtype=np.float32)  # 0.0 (yorgun değil) - 1.0 (çok yorgun)
     
+    def _refresh_reward_params(self) -> None:
+        """
+        reward_params'tan okunan değerleri (varsayılanlarıyla) önbelleğe alır.
+
+        step() her adımda sözlükten .get() yapmasın diye değerler düz float niteliklerde
+        ve çekirdeğin _finish_params dizisinde tutuluyor. reward_params bölümler arasında
+        değiştirilirse reset() bunu zaten tekrar çağırıyor.
+        """
+        reward_params = self.reward_params
+
+        params = self._finish_params
+        params[FINISH_FATIGUE_THRESHOLD] = self.fatigue_threshold_ratio
+        params[FINISH_FATIGUE_PENALTY_SCALE] = self.fatigue_penalty_scale
+        params[FINISH_PENALTY_OVER_CAPACITY] = reward_params.get("penalty_over_capacity", 1.0)
+        params[FINISH_REWARD_APPROPRIATE] = reward_params.get("reward_appropriate_assignment", 10.0)
+        params[FINISH_PENALTY_SLOW] = reward_params.get("penalty_slow_production", 5.0)
+        params[FINISH_PENALTY_MISMATCH] = reward_params["penalty_mismatch_low_skill"]
+        params[FINISH_REWARD_SKILL_SCALE] = reward_params["reward_skill_scale"]
+        params[FINISH_PENALTY_DEFECTIVE] = reward_params.get("penalty_defective_product", 15.0)
+        params[FINISH_REWARD_PER_GOOD_PART] = reward_params["reward_per_good_part"]
+        params[FINISH_REWARD_SUCCESSFUL_PART] = reward_params.get("reward_successful_part", 1.0)
+        params[FINISH_BONUS_50] = reward_params.get("bonus_reach_50_percent", 0.0)
+        params[FINISH_BONUS_80] = reward_params.get("bonus_reach_80_percent", 0.0)
+
+        self._r_switch_operator = reward_params["penalty_switch_operator"]
+        self._r_machine_idle = reward_params.get("penalty_machine_idle", 10.0)
+        self._r_prevent_idle = reward_params.get("reward_prevent_idle", 5.0)
+        self._r_goal_bonus = reward_params["goal_bonus"]
+        self._r_shortfall_scale = reward_params["shortfall_penalty_scale"]
+
     def _record_snapshot(self) -> None:
         """
         Eğer history kaydı açıksa, o anki durumu GIF için küçük bir snapshot olarak saklıyorum.
@@ -108,45 +236,111 @@ class FactoryEnv:
         """
         if not self.record_history:
             return
-        
-        # Mevcut self.machines'e göre machine_assignments, operator_skills ve makine durumları oluştur
-        machine_assignments = []
-        operator_skills = []
-        machine_statuses = []
-        
-        for m in self.machines:
-            # Makine durumu (idle / busy / broken / maintenance)
-            status = m.get("status", "idle")
-            machine_statuses.append(status)
-            
-            if m.get("current_operator_id") is not None:
-                op_id = m["current_operator_id"]
-                machine_assignments.append(op_id)
-                machine_type_idx = m["machine_type_index"]
-                skill = float(self.skill_matrix[op_id, machine_type_idx])
-                operator_skills.append(skill)
+
+        # history_max_frames verildiyse sadece her _history_stride'ıncı snapshot saklanıyor
+        count = self._snapshot_count
+        self._snapshot_count = count + 1
+        if count % self._history_stride:
+            return
+
+        # Burada sadece ham değerleri bir sonraki kayda yazıyorum; beceri ve durum isimlerine
+        # dönüştürme get_history() çağrılınca bir kere yapılıyor
+        if self._frame_idx == self.history_frames.shape[0]:
+            max_frames = self.history_max_frames
+            if max_frames is not None and self._frame_idx >= max_frames:
+                # Sınıra gelindi: eldeki frame'lerin ikide birini tut, adımı ikiye katla.
+                # Kalan frame'ler yeni adımın katlarına denk geliyor; bu snapshot da öyleyse yazılır.
+                kept = self.history_frames[:self._frame_idx:2]
+                self.history_frames[:kept.shape[0]] = kept
+                self._frame_idx = kept.shape[0]
+                self._history_stride *= 2
+                if count % self._history_stride:
+                    return
             else:
-                machine_assignments.append(-1)
-                operator_skills.append(-1.0)
-        
-        snapshot = {
-            "time": float(self.current_time_minutes),
-            "shift_index": int(self.current_shift_index),
-            "machine_assignments": machine_assignments,
-            "operator_skills": operator_skills,
-            "machine_statuses": machine_statuses,  # Her makinenin gerçek durumu
-            "produced_good_parts": int(self.produced_good_parts),
-        }
-        
-        self.history_frames.append(snapshot)
+                # Tahmin edilen frame sayısı aşıldı (olay başına da snapshot alınıyor); diziyi büyüt
+                grow = max(16, self._frame_idx)
+                if max_frames is not None:
+                    grow = min(grow, max_frames - self._frame_idx)
+                self.history_frames = np.concatenate(
+                    [self.history_frames, np.empty(grow, dtype=self._history_dtype)]
+                )
+        self.history_frames[self._frame_idx] = (
+            self.current_time_minutes,
+            self.current_shift_index,
+            self.produced_good_parts,
+            self.machine_op,
+            self.machine_status,
+        )
+        self._frame_idx += 1
+
+    def _reset_history(self) -> None:
+        """
+        History dizisini boşaltır; kayıt açıksa bir günlük frame sayısı kadar (history_max_frames
+        verildiyse en fazla o kadar) önceden yer ayırır.
+        """
+        if self.record_history:
+            num_frames = int(self.day_duration_minutes / self.history_interval_minutes) + 16
+            if self.history_max_frames is not None:
+                num_frames = min(num_frames, self.history_max_frames)
+        else:
+            num_frames = 0
+        if self.history_frames.shape[0] != num_frames:
+            self.history_frames = np.empty(num_frames, dtype=self._history_dtype)
+        self._frame_idx = 0
+        self._history_stride = 1
+        self._snapshot_count = 0
     
     @property
     def current_shift_index(self) -> int:
         """
         Mevcut simülasyon zamanına göre hangi vardiyada olduğumuzu döndürür (0, 1 veya 2).
+
+        Her erişimde bölme yapmamak için değeri sadece zaman ilerleyince güncelliyorum.
+        """
+        return self._current_shift_index
+
+    @property
+    def machines(self) -> List[Dict[str, Any]]:
         """
+        Makine durumunun eski sözlük listesi biçimindeki görünümü (dışarıdan okuyanlar için).
+
+        Her çağrıda dizilerden yeniden kuruluyor ve sadece okumalık; sözlüklere yazmak
+        ortamı değiştirmiyor. Sıcak döngüde kullanmayın.
+        """
+        time_remaining = np.where(np.isfinite(self.machine_time_remaining), self.machine_time_remaining, 0.0)
+        return [
+            {
+                "status": MACHINE_STATUS_NAMES[status],
+                "machine_type_index": type_idx,
+                "priority": priority,
+                "current_operator_id": op_id if op_id >= 0 else None,
+                "time_remaining": remaining,
+            }
+            for status, type_idx, priority, op_id, remaining in zip(
+                self.machine_status.tolist(),
+                self.machine_type_index.tolist(),
+                self._priority_by_machine,
+                self.machine_op.tolist(),
+                time_remaining.tolist(),
+            )
+        ]
+
+    @property
+    def operators(self) -> List[Dict[str, Any]]:
+        """Operatör durumunun eski sözlük listesi biçimindeki salt-okunur görünümü (bkz. machines)."""
+        return [
+            {
+                "status": "idle" if status == OPERATOR_IDLE else "busy",
+                "current_machine_id": m_id if m_id >= 0 else None,
+            }
+            for status, m_id in zip(self.operator_status.tolist(), self.operator_machine.tolist())
+        ]
+
+    def _advance_time(self, time_advance: float) -> None:
+        """Simülasyon saatini ilerletir ve önbellekteki vardiya indeksini günceller."""
+        self.current_time_minutes += time_advance
         shift_idx = int(self.current_time_minutes // self.shift_length_minutes)
-        return min(shift_idx, self.num_shifts - 1)
+        self._current_shift_index = min(shift_idx, self.num_shifts - 1)
         
     def reset(self, record_history: bool = False) -> Tuple:
         """
@@ -156,38 +350,30 @@ class FactoryEnv:
         hafızada tutuyorum.
         """
         self.current_time_minutes = 0.0
+        self._current_shift_index = 0
         self.produced_good_parts = 0
-        
-        # Makineleri başlat
-        self.machines = []
-        for i in range(self.num_machines):
-            machine = {
-                "status": "idle",
-                "machine_type_index": i % len(self.machine_types),
-                "priority": self.machine_priorities[i] if i < len(self.machine_priorities) else 0,
-                "current_operator_id": None,
-                "time_remaining": 0.0
-            }
-            self.machines.append(machine)
-        
+        self._state_dirty = True
+        self._refresh_reward_params()
+        
+        # Makineleri başlat (hepsi boş, operatörsüz)
+        self.machine_status.fill(MACHINE_IDLE)
+        self.machine_op.fill(-1)
+        self._busy_count = 0
+        self._down_count = 0
+
         # Operatörleri başlat
-        self.operators = []
-        for i in range(self.num_operators):
-            operator = {
-                "status": "idle",
-                "current_machine_id": None
-            }
-            self.operators.append(operator)
+        self.operator_status.fill(OPERATOR_IDLE)
+        self.operator_machine.fill(-1)
         
         # Son operatör takibini sıfırla
-        self.last_operator_per_machine = [None] * self.num_machines
+        self.last_operator_per_machine.fill(-1)
         
-        # Operatör çalışma süresi takibini vardiya başına sıfırla
-        self.operator_work_minutes_per_shift = np.zeros((self.num_operators, self.num_shifts), dtype=np.float32)
+        # Operatör çalışma süresi takibini vardiya başına sıfırla (yeni dizi ayırmadan)
+        self.operator_work_minutes_per_shift.fill(0.0)
         
         # History kayıt kurulumu
         self.record_history = record_history
-        self.history_frames = []
+        self._reset_history()
         self.last_history_time = 0.0
         
         # Kilometre taşı takip bayraklarını sıfırla
@@ -195,13 +381,15 @@ class FactoryEnv:
         self.reached_80_percent = False
         
         # İşlem takibini sıfırla
-        self.machine_processing_remaining = {}
+        self.machine_time_remaining.fill(np.inf)
+        self.machine_assign_seq.fill(0)
+        self._assign_counter = 0
         
         # Arıza/bakım takibini sıfırla
-        self.machine_down_until = [None] * self.num_machines
+        self.machine_down_until.fill(-np.inf)
         
         # Yorgunluk takibini sıfırla
-        self.operator_fatigue_level = np.zeros(self.num_operators, dtype=np.float32)
+        self.operator_fatigue_level.fill(0.0)
         
         # İlk boş makineyi seç
         self.current_machine_id = self._select_next_idle_machine()
@@ -211,7 +399,7 @@ class FactoryEnv:
     def start_recording(self) -> None:
         """Görselleştirme için olay geçmişini kaydetmeye başlar."""
         self.record_history = True
-        self.history_frames = []
+        self._reset_history()
     
     def stop_recording(self) -> None:
         """Olay geçmişini kaydetmeyi durdurur."""
@@ -220,11 +408,39 @@ class FactoryEnv:
     def get_history(self) -> List[Dict[str, Any]]:
         """
         Kaydedilen olay geçmişini alır.
-        
+
+        Ham snapshot'lar burada eski sözlük şemasına (machine_assignments, operator_skills,
+        machine_statuses ...) açılıyor; GIF tarafı bu şemayı bekliyor.
+
         Returns:
             History snapshot'larının listesi
         """
-        return list(self.history_frames)
+        frames = self.history_frames[:self._frame_idx]
+        machine_op = frames["machine_op"]
+
+        # Atanmış operatörlerin becerilerini tüm frame'ler için tek seferde oku (-1.0: operatör yok)
+        skills = self.skill_matrix[np.maximum(machine_op, 0), self.machine_type_index]
+        operator_skills = np.where(machine_op >= 0, skills, -1.0)
+        status_names = np.array(MACHINE_STATUS_NAMES, dtype=object)[frames["machine_status"]]
+
+        return [
+            {
+                "time": time,
+                "shift_index": shift_index,
+                "machine_assignments": assignments,
+                "operator_skills": op_skills,
+                "machine_statuses": statuses,  # Her makinenin gerçek durumu
+                "produced_good_parts": produced,
+            }
+            for time, shift_index, assignments, op_skills, statuses, produced in zip(
+                frames["time"].tolist(),
+                frames["shift_index"].tolist(),
+                machine_op.tolist(),
+                operator_skills.tolist(),
+                status_names.tolist(),
+                frames["produced"].tolist(),
+            )
+        ]
     
     def _get_state(self) -> Tuple:
         """
@@ -232,78 +448,49 @@ class FactoryEnv:
         
         3 vardiya simülasyonunu desteklemek için artık mevcut vardiya indeksini içerir.
         
+        Adımların yaklaşık yarısında durum değişmiyor (sadece zaman ilerliyor ama hiçbir kova
+        sınırı geçilmiyor). Makine/operatör dizileri değişmediyse (_state_dirty False) ve
+        skaler kovalar da aynıysa önceki tuple'ı aynen döndürüyorum.
+
         Returns:
             Mevcut durumu temsil eden hash edilebilir bir tuple
         """
-        if self.current_machine_id is None:
-            # Boş makine yok, varsayılan bir durum döndür
-            current_machine_id = 0
-            current_machine_priority = 0
-        else:
-            current_machine_id = self.current_machine_id
-            current_machine_priority = self.machines[current_machine_id]["priority"]
-        
         # Mevcut vardiya indeksi (0'dan num_shifts-1'e kadar)
         current_shift_index = self.current_shift_index
         
         # Kalan süre kovası (0-3) - artık tam gün süresine göre
+        # (0: bitti, 1: <= gün/4, 2: <= gün/2, 3: daha fazla)
         time_remaining = self.day_duration_minutes - self.current_time_minutes
-        if time_remaining <= 0:
-            time_bucket = 0
-        elif time_remaining <= self.day_duration_minutes / 4:
-            time_bucket = 1
-        elif time_remaining <= self.day_duration_minutes / 2:
-            time_bucket = 2
-        else:
-            time_bucket = 3
-        
-        # Üretim açığı kovası (0-3) - artık günlük hedefe göre
+        time_bucket = bisect.bisect_left(self._time_thresholds, time_remaining)
+
+        # Üretim açığı kovası (0-3) - artık günlük hedefe göre (0: hedef tuttu, 1: <= 30, 2: <= 60, 3: daha fazla)
         production_gap = self.target_production_per_day - self.produced_good_parts
-        if production_gap <= 0:
-            gap_bucket = 0
-        elif production_gap <= 30:
-            gap_bucket = 1
-        elif production_gap <= 60:
-            gap_bucket = 2
+        gap_bucket = bisect.bisect_left(self._gap_thresholds, production_gap)
+
+        scalar_key = (self.current_machine_id, current_shift_index, time_bucket, gap_bucket)
+        if not self._state_dirty and scalar_key == self._cached_state_key:
+            return self._cached_state
+
+        if self.current_machine_id is None:
+            # Boş makine yok, varsayılan bir durum döndür
+            current_machine_id = 0
+            current_machine_priority = 0
         else:
-            gap_bucket = 3
-        
-        # Operatör müsaitliği (operatör başına 0/1 tuple)
-        operator_availability = tuple(
-            1 if op["status"] == "idle" else 0
-            for op in self.operators
-        )
-        
-        # Mevcut makine için operatör beceri seviyesi kovaları
+            current_machine_id = self.current_machine_id
+            current_machine_priority = self._priority_by_machine[current_machine_id]
+
+        # Operatör müsaitliği: i. bit 1 ise operatör i boşta
+        operator_availability = int(self._operator_bits[self.operator_status == OPERATOR_IDLE].sum())
+
+        # Mevcut makine için operatör beceri seviyesi kovaları (3 tabanında paketli; makine yoksa hepsi 0)
         if self.current_machine_id is not None:
-            machine_type_idx = self.machines[self.current_machine_id]["machine_type_index"]
-            operator_skill_buckets = []
-            for op_idx in range(self.num_operators):
-                skill = self.skill_matrix[op_idx, machine_type_idx]
-                if skill < 0.3:
-                    skill_bucket = 0  # düşük
-                elif skill < 0.7:
-                    skill_bucket = 1  # orta
-                else:
-                    skill_bucket = 2  # yüksek
-                operator_skill_buckets.append(skill_bucket)
+            operator_skill_key = self._skill_key_by_machine[self.current_machine_id]
         else:
-            operator_skill_buckets = [0] * self.num_operators
-        
-        # Makine durumları: 0=idle, 1=busy, 2=broken, 3=maintenance
-        machine_status_buckets = []
-        for m_id in range(self.num_machines):
-            m = self.machines[m_id]
-            if m["status"] == "broken":
-                status_bucket = 2
-            elif m["status"] == "maintenance":
-                status_bucket = 3
-            elif m["status"] == "busy":
-                status_bucket = 1
-            else:
-                status_bucket = 0  # idle
-            machine_status_buckets.append(status_bucket)
-        
+            operator_skill_key = 0
+
+        # Makine durumları: 0=idle, 1=busy, 2=broken, 3=maintenance (dizideki kodlar zaten bunlar)
+        machine_status_buckets = self.machine_status.tolist()
+
         # Durum tuple'ına birleştir (artık vardiya indeksini ve makine durumlarını içerir)
         state = (
             current_machine_id,
@@ -312,12 +499,26 @@ class FactoryEnv:
             time_bucket,
             gap_bucket,
             operator_availability,
-            tuple(operator_skill_buckets),
+            operator_skill_key,
             tuple(machine_status_buckets),  # Makine durumları eklendi
         )
-        
+
+        self._cached_state = state
+        self._cached_state_key = scalar_key
+        self._state_dirty = False
         return state
     
+    def _start_processing(self, machine_id: int, process_time: float) -> None:
+        """Makinede yeni bir parçanın işlenmesini başlatır (kalan süre + atama sırası)."""
+        self.machine_time_remaining[machine_id] = process_time
+        self._assign_counter += 1
+        self.machine_assign_seq[machine_id] = self._assign_counter
+
+    def _idle_machine_mask(self) -> np.ndarray:
+        """Boş VE arızasız/bakımsız makineler için True olan maske."""
+        is_down = self.current_time_minutes < self.machine_down_until
+        return (self.machine_status == MACHINE_IDLE) & ~is_down
+
     def _select_next_idle_machine(self) -> Optional[int]:
         """
         Karar verme için bir sonraki boş makineyi seçer.
@@ -326,91 +527,54 @@ class FactoryEnv:
         Returns:
             Seçilen boş makinenin makine ID'si veya boş makine yoksa None
         """
-        idle_machines = []
-        for i, m in enumerate(self.machines):
-            # Sadece boş VE arızasız/bakımsız makineleri seç
-            if m["status"] == "idle":
-                # Arıza/bakım kontrolü
-                is_down = self.machine_down_until[i] is not None and self.current_time_minutes < self.machine_down_until[i]
-                if not is_down:
-                    idle_machines.append(i)
-        
-        if not idle_machines:
+        idle_machines = np.flatnonzero(self._idle_machine_mask())
+        if idle_machines.size == 0:
             return None
-        
-        # Önceliğe göre sırala (azalan), sonra indekse göre
-        idle_machines.sort(key=lambda i: (-self.machines[i]["priority"], i))
-        
-        return idle_machines[0]
-    
-    def _check_machine_breakdown(self, machine_id: int) -> bool:
-        """
-        Bir makinenin arıza yapıp yapmadığını kontrol eder.
-        
-        Args:
-            machine_id: Kontrol edilecek makine ID'si
-        
-        Returns:
-            True ise arıza yaptı, False ise normal
-        """
-        if self.rng.random() < self.breakdown_prob:
-            # Arıza süresini hesapla (1-2 vardiya arası, minimum 60 dakika)
-            max_duration = self.max_breakdown_shifts * self.shift_length_minutes
-            duration = max(
-                self.min_breakdown_minutes,
-                self.rng.uniform(0.5 * max_duration, max_duration)
-            )
-            self.machine_down_until[machine_id] = self.current_time_minutes + duration
-            self.machines[machine_id]["status"] = "broken"
-            return True
-        return False
+
+        # En yüksek öncelikli makine; eşitlikte argmax ilkini (en küçük indeksi) veriyor
+        return int(idle_machines[np.argmax(self.machine_priority[idle_machines])])
     
-    def _check_machine_maintenance(self, machine_id: int) -> bool:
+    def _roll_events(self, count: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
         """
-        Bir makinenin bakıma girip girmediğini kontrol eder.
-        
-        Args:
-            machine_id: Kontrol edilecek makine ID'si
-        
+        Parçası biten count adet makine için tüm zarları tek seferde atar.
+
+        Makine başına üç uniform sayı tek bir çağrıda çekiliyor. Birincisi parçanın hatalı
+        olup olmadığı için (finish_part_kernel'e olduğu gibi veriliyor). İkincisi olay için:
+        u < breakdown_prob ise arıza, breakdown_prob <= u < breakdown_prob + maintenance_prob
+        ise bakım (arıza önce kontrol ediliyor, ikisi aynı anda olamıyor). Üçüncüsü süre için:
+        0.5*max ile max arası (max = vardiya sayısı * vardiya süresi), alttan arıza için 60,
+        bakım için 30 dakikayla (varsayılan) sınırlı.
+
         Returns:
-            True ise bakıma girdi, False ise normal
+            (hata zarları, arıza maskesi, arıza veya bakım maskesi, dakika cinsinden süreler)
         """
-        if self.rng.random() < self.maintenance_prob:
-            # Bakım süresini hesapla (1-2 vardiya arası, minimum 30 dakika)
-            max_duration = self.max_maintenance_shifts * self.shift_length_minutes
-            duration = max(
-                self.min_maintenance_minutes,
-                self.rng.uniform(0.5 * max_duration, max_duration)
-            )
-            self.machine_down_until[machine_id] = self.current_time_minutes + duration
-            self.machines[machine_id]["status"] = "maintenance"
-            return True
-        return False
-    
-    def _update_operator_fatigue(self, operator_id: int, current_shift_idx: int) -> float:
+        u = self.rng.random((3, count))
+        breakdown = u[1] < self.breakdown_prob
+        downtime = u[1] < self.breakdown_prob + self.maintenance_prob
+
+        fraction = 0.5 + 0.5 * u[2]
+        max_breakdown = self.max_breakdown_shifts * self.shift_length_minutes
+        max_maintenance = self.max_maintenance_shifts * self.shift_length_minutes
+        durations = np.where(
+            breakdown,
+            np.maximum(self.min_breakdown_minutes, fraction * max_breakdown),
+            np.maximum(self.min_maintenance_minutes, fraction * max_maintenance),
+        )
+        return u[0], breakdown, downtime, durations
+
+    def _start_downtime(self, machine_id: int, operator_id: int, broken: bool, duration: float) -> None:
         """
-        Operatör yorgunluğunu günceller ve yorgunluk seviyesini döndürür.
-        
-        Args:
-            operator_id: Operatör ID'si
-            current_shift_idx: Mevcut vardiya indeksi
-        
-        Returns:
-            Yorgunluk seviyesi (0.0 - 1.0)
+        Makineyi duration dakikalığına arızaya (broken=True) veya bakıma alır ve
+        operatörünü serbest bırakır.
         """
-        capacity = self.operator_shift_capacity_minutes[operator_id, current_shift_idx]
-        worked = self.operator_work_minutes_per_shift[operator_id, current_shift_idx]
-        
-        if capacity > 0:
-            usage_ratio = worked / capacity
-            # Kapasitenin %80'ini aştığında yorgunluk başlar
-            if usage_ratio >= self.fatigue_threshold_ratio:
-                # Yorgunluk seviyesi: 0.0 (eşik) - 1.0 (kapasite aşımı)
-                fatigue = min(1.0, (usage_ratio - self.fatigue_threshold_ratio) / (1.0 - self.fatigue_threshold_ratio))
-                self.operator_fatigue_level[operator_id] = fatigue
-                return fatigue
-        
-        return 0.0
+        self.machine_status[machine_id] = MACHINE_BROKEN if broken else MACHINE_MAINTENANCE
+        self._down_count += 1
+        self.machine_down_until[machine_id] = self.current_time_minutes + duration
+
+        self.machine_op[machine_id] = -1
+        self.operator_status[operator_id] = OPERATOR_IDLE
+        self.operator_machine[operator_id] = -1
+        self.machine_time_remaining[machine_id] = np.inf
     
     def step(self, action: int) -> Tuple[Tuple, float, bool, Dict[str, Any]]:
         """
@@ -431,39 +595,38 @@ class FactoryEnv:
         
         # Önce, eylemi işle (varsa boş makineye operatör atama)
         if self.current_machine_id is not None:
-            machine = self.machines[self.current_machine_id]
-            
+            machine_id = self.current_machine_id
+
             if action < self.num_operators:
                 # Makineye operatör atama
                 operator_id = action
-                
+
                 # Operatörün müsait olup olmadığını kontrol et
-                if self.operators[operator_id]["status"] == "busy":
+                if self.operator_status[operator_id] == OPERATOR_BUSY:
                     # Operatör meşgul, atama yapılamaz - küçük ceza
                     reward -= 0.1
                 else:
                     # Varsa operatörü önceki makineden serbest bırak
-                    prev_machine_id = self.operators[operator_id]["current_machine_id"]
-                    if prev_machine_id is not None:
-                        prev_machine = self.machines[prev_machine_id]
-                        prev_machine["current_operator_id"] = None
-                        prev_machine["status"] = "idle"
-                        if prev_machine_id in self.machine_processing_remaining:
-                            del self.machine_processing_remaining[prev_machine_id]
-                    
+                    prev_machine_id = int(self.operator_machine[operator_id])
+                    if prev_machine_id >= 0:
+                        if self.machine_status[prev_machine_id] == MACHINE_BUSY:
+                            self._busy_count -= 1
+                        self.machine_op[prev_machine_id] = -1
+                        self.machine_status[prev_machine_id] = MACHINE_IDLE
+                        self.machine_time_remaining[prev_machine_id] = np.inf
+
                     # Mevcut makineye operatör atama
-                    machine["current_operator_id"] = operator_id
-                    machine["status"] = "busy"
-                    self.operators[operator_id]["current_machine_id"] = self.current_machine_id
-                    self.operators[operator_id]["status"] = "busy"
-                    
+                    self._state_dirty = True
+                    self.machine_op[machine_id] = operator_id
+                    self.machine_status[machine_id] = MACHINE_BUSY
+                    self._busy_count += 1
+                    self.operator_machine[operator_id] = machine_id
+                    self.operator_status[operator_id] = OPERATOR_BUSY
+
                     # İşlem süresini hesapla ve takibe başla (asgari süreyi zorla)
-                    machine_type_idx = machine["machine_type_index"]
-                    skill = self.skill_matrix[operator_id, machine_type_idx]
-                    raw_time = self.base_process_times[machine_type_idx] / max(skill, 0.1)
-                    min_time = self.min_process_times[machine_type_idx]
-                    process_time = max(raw_time, min_time)
-                    self.machine_processing_remaining[self.current_machine_id] = process_time
+                    machine_type_idx = self.machine_type_index[machine_id]
+                    process_time = self.effective_process_time[operator_id, machine_type_idx]
+                    self._start_processing(machine_id, process_time)
                     
                     # Operatör atama anında snapshot kaydet (tüm makineleri görmek için)
                     # NOT: Bu snapshot, yeni atama yapıldıktan SONRA kaydediliyor
@@ -473,11 +636,11 @@ class FactoryEnv:
                         self.last_history_time = self.current_time_minutes
                     
                     # Operatör değiştirme maliyetini kontrol et
-                    if self.last_operator_per_machine[self.current_machine_id] is not None:
-                        if self.last_operator_per_machine[self.current_machine_id] != operator_id:
-                            reward -= self.reward_params["penalty_switch_operator"]
+                    prev_operator = self.last_operator_per_machine[machine_id]
+                    if prev_operator >= 0 and prev_operator != operator_id:
+                        reward -= self._r_switch_operator
                     
-                    self.last_operator_per_machine[self.current_machine_id] = operator_id
+                    self.last_operator_per_machine[machine_id] = operator_id
         
         # Ek: Diğer boş makineleri de otomatik doldur (heuristic), böylece 4 makineye kadar paralel çalışma olur.
         # Bu otomatik atama, ajanın seçmediği makineler için sadece ortam mantığıdır;
@@ -488,81 +651,54 @@ class FactoryEnv:
             # Otomatik atama yapmadan önce mevcut durumu kaydetmek gereksiz; zaten yukarıda kaydettik.
             pass
         
-        # Müsait operatörleri ve boş makineleri topla
-        available_operators = [
-            op_id for op_id, op in enumerate(self.operators)
-            if op["status"] == "idle"
-        ]
-        
-        idle_machines = []
-        for m_id, m in enumerate(self.machines):
-            if m["status"] == "idle":
-                # Arıza/bakım durumunda olan makineleri hariç tut
-                is_down = self.machine_down_until[m_id] is not None and self.current_time_minutes < self.machine_down_until[m_id]
-                if not is_down:
-                    idle_machines.append(m_id)
-        
-        # current_machine_id zaten ajan tarafından atandıysa, onu otomatik atamadan çıkar
-        if self.current_machine_id is not None and self.machines[self.current_machine_id]["status"] == "busy":
-            idle_machines = [m_id for m_id in idle_machines if m_id != self.current_machine_id]
-        
-        # Boş makineleri önceliğe göre sırala (yüksek öncelik önce)
-        idle_machines.sort(key=lambda i: (-self.machines[i]["priority"], i))
-        
-        # Her boş makine için en uygun (müsait) operatörü seç ve ata
-        for m_id in idle_machines:
-            if not available_operators:
-                break
-            
-            machine = self.machines[m_id]
-            machine_type_idx = machine["machine_type_index"]
-            
-            # En yüksek beceriye sahip operatörü seç (müsaitler arasından)
-            best_op = None
-            best_skill = -1.0
-            for op_id in available_operators:
-                skill = float(self.skill_matrix[op_id, machine_type_idx])
-                if skill > best_skill:
-                    best_skill = skill
-                    best_op = op_id
-            
-            if best_op is None:
-                break
-            
-            # Operatörü bu makineye ata (görselleştirme ve daha dolu fabrika için)
-            machine["current_operator_id"] = best_op
-            machine["status"] = "busy"
-            self.operators[best_op]["current_machine_id"] = m_id
-            self.operators[best_op]["status"] = "busy"
-            
-            # İşlem süresini hesapla ve takibe başla (asgari süreyi zorla)
-            raw_time = self.base_process_times[machine_type_idx] / max(best_skill, 0.1)
-            min_time = self.min_process_times[machine_type_idx]
-            process_time = max(raw_time, min_time)
-            self.machine_processing_remaining[m_id] = process_time
-            
-            # Kullanılan operatörü listeden çıkar
-            available_operators.remove(best_op)
+        # Boş makineleri topla (müsait operatörler operator_status maskesinden okunuyor)
+        # Arıza/bakım durumunda olan makineler maskede zaten hariç. Ajanın az önce atadığı
+        # current_machine_id artık meşgul olduğu için o da otomatik atamaya girmiyor.
+        idle_machines = np.flatnonzero(self._idle_machine_mask())
+
+        # Boş makineleri önceliğe göre sırala (yüksek öncelik önce, eşitlikte küçük indeks önce)
+        idle_machines = idle_machines[np.argsort(-self.machine_priority[idle_machines], kind="stable")]
+
+        # Her boş makine için en uygun (müsait) operatörü seç ve ata (görselleştirme ve daha dolu fabrika için);
+        # operatör seçimi, atama ve işlem süresinin başlatılması derlenmiş çekirdekte
+        if idle_machines.size:
+            self._state_dirty = True
+            assign_counter_before = self._assign_counter
+            self._assign_counter = autofill_kernel(
+                idle_machines,
+                self._skill_rank,
+                self.machine_type_index,
+                self.effective_process_time,
+                self.machine_op,
+                self.machine_status,
+                self.operator_status,
+                self.operator_machine,
+                self.machine_time_remaining,
+                self.machine_assign_seq,
+                self._assign_counter,
+            )
+            # Çekirdek her atamada sayacı bir artırıyor
+            self._busy_count += self._assign_counter - assign_counter_before
         
         # Arıza/bakım süresi biten makineleri tekrar kullanılabilir hale getir
-        for m_id in range(self.num_machines):
-            if self.machine_down_until[m_id] is not None:
-                if self.current_time_minutes >= self.machine_down_until[m_id]:
-                    # Arıza/bakım bitti, makineyi tekrar kullanılabilir yap
-                    self.machine_down_until[m_id] = None
-                    if self.machines[m_id]["status"] in ["broken", "maintenance"]:
-                        self.machines[m_id]["status"] = "idle"
+        released = (self.machine_status >= MACHINE_BROKEN) & (self.current_time_minutes >= self.machine_down_until)
+        if released.any():
+            self._state_dirty = True
+            self._down_count -= int(np.count_nonzero(released))
+            self.machine_status[released] = MACHINE_IDLE
+            self.machine_down_until[released] = -np.inf
         
         # Şimdi, bir sonraki makine bitene kadar zamanı ilerlet (paralel işleme)
         # Tüm meşgul makineler arasında minimum kalan işlem süresini bul
-        if not self.machine_processing_remaining:
+        # (boş makinelerde kalan süre inf, hepsi boşsa minimum da inf)
+        min_time = self.machine_time_remaining.min()
+        if min_time == np.inf:
             # İşleyen makine yok, zamanı biraz ilerlet (ama episode süresini aşma)
             time_advance = min(1.0, self.day_duration_minutes - self.current_time_minutes)
             if time_advance > 0:
-                self.current_time_minutes += time_advance
+                self._advance_time(time_advance)
         else:
-            # İlk bitecek makineyi bul
-            min_time = min(self.machine_processing_remaining.values())
+            # İlk bitecek makine min_time'da bitiyor
             time_advance = min_time
             
             # Episode süresini aşmayacak şekilde zaman ilerlemesini sınırla
@@ -582,147 +718,103 @@ class FactoryEnv:
                     self._record_snapshot()
                     self.last_history_time = self.current_time_minutes
                 
-                self.current_time_minutes += time_advance
+                self._advance_time(time_advance)
                 
-                # Tüm meşgul makinelerin kalan sürelerini güncelle
-                finished_machines = []
-                for m_id, remaining in list(self.machine_processing_remaining.items()):
-                    new_remaining = remaining - time_advance
-                    if new_remaining <= 0.0001:  # Makine bitti
-                        finished_machines.append(m_id)
-                        self.machine_processing_remaining[m_id] = 0.0
-                    else:
-                        self.machine_processing_remaining[m_id] = new_remaining
+                # Tüm meşgul makinelerin kalan sürelerini güncelle (maske gerekmiyor: inf - x = inf)
+                self.machine_time_remaining -= time_advance
+                finished = np.flatnonzero(self.machine_time_remaining <= 0.0001)  # Biten makineler
+                self.machine_time_remaining[finished] = 0.0
+                # Atanma sırasına göre işle
+                finished_machines = finished[np.argsort(self.machine_assign_seq[finished])].tolist()
             else:
                 finished_machines = []
             
             # Tüm biten makineleri işle (sadece episode bitmemişse)
             # Episode bitmişse, biten makineleri işleme (zaman aşımı nedeniyle)
             episode_ended = self.current_time_minutes >= self.day_duration_minutes
-            
-            for m_id in finished_machines:
+
+            if finished_machines:
+                self._state_dirty = True
+
+            # Biten makinelerin hata ve arıza/bakım zarlarını tek seferde at
+            if finished_machines and not episode_ended:
+                defect_u, breakdowns, downtime_mask, downtime_minutes = self._roll_events(len(finished_machines))
+                defect_u = defect_u.tolist()
+                breakdowns = breakdowns.tolist()
+                downtime_mask = downtime_mask.tolist()
+                downtime_minutes = downtime_minutes.tolist()
+
+            for i, m_id in enumerate(finished_machines):
                 # Episode bitmişse, bu makineyi işleme (zaman aşımı)
                 if episode_ended:
                     # Makineyi ve operatörü serbest bırak ama parça üretme
-                    m = self.machines[m_id]
-                    if m["current_operator_id"] is not None:
-                        operator_id = m["current_operator_id"]
-                        m["status"] = "idle"
-                        m["current_operator_id"] = None
-                        self.operators[operator_id]["status"] = "idle"
-                        self.operators[operator_id]["current_machine_id"] = None
-                        if m_id in self.machine_processing_remaining:
-                            del self.machine_processing_remaining[m_id]
+                    operator_id = int(self.machine_op[m_id])
+                    if operator_id >= 0:
+                        self.machine_status[m_id] = MACHINE_IDLE
+                        self._busy_count -= 1
+                        self.machine_op[m_id] = -1
+                        self.operator_status[operator_id] = OPERATOR_IDLE
+                        self.operator_machine[operator_id] = -1
+                        self.machine_time_remaining[m_id] = np.inf
                     continue
                 
-                m = self.machines[m_id]
-                if m["current_operator_id"] is not None:
-                    operator_id = m["current_operator_id"]
-                    machine_type_idx = m["machine_type_index"]
-                    skill = self.skill_matrix[operator_id, machine_type_idx]
-                    
-                    # Mevcut vardiya indeksini al
-                    current_shift_idx = self.current_shift_index
-                    
-                    # Operatör çalışma süresini takip et (asgari işlem süresini dikkate al)
-                    raw_time = self.base_process_times[machine_type_idx] / max(skill, 0.1)
-                    min_time = self.min_process_times[machine_type_idx]
-                    process_time = max(raw_time, min_time)
-                    self.operator_work_minutes_per_shift[operator_id, current_shift_idx] += process_time
-                    
-                    # Yorgunluk kontrolü ve güncelleme
-                    fatigue = self._update_operator_fatigue(operator_id, current_shift_idx)
-                    if fatigue > 0:
-                        # Yorgunluk cezası: yorgunluk seviyesine göre
-                        fatigue_penalty = self.fatigue_penalty_scale * fatigue
-                        reward -= fatigue_penalty
-                    
-                    # Kapasite aşımını kontrol et
-                    capacity = self.operator_shift_capacity_minutes[operator_id, current_shift_idx]
-                    worked_minutes = self.operator_work_minutes_per_shift[operator_id, current_shift_idx]
-                    
-                    if worked_minutes > capacity:
-                        overuse_ratio = (worked_minutes - capacity) / capacity
-                        penalty = self.reward_params.get("penalty_over_capacity", 1.0) * overuse_ratio
-                        reward -= penalty
-                    
-                    # Beceri bazlı ödüller
-                    # Uygun eşleşme kontrolü (yüksek beceri = uygun eşleşme)
-                    if skill >= 0.7:
-                        reward += self.reward_params.get("reward_appropriate_assignment", 10.0)
-                    elif skill < 0.3:
-                        # Düşük beceri = uygunsuz eşleşme, yavaş üretim
-                        reward -= self.reward_params.get("penalty_slow_production", 5.0)
-                        reward -= self.reward_params["penalty_mismatch_low_skill"]
-                    else:
-                        # Orta beceri için küçük ödül
-                        reward += self.reward_params["reward_skill_scale"] * skill
-                    
-                    # Parçanın hatalı olup olmadığını belirle
-                    p_defect = max(0.0, 0.5 - skill)
-                    is_defective = self.rng.random() < p_defect
-                    
-                    if is_defective:
-                        # Hatalı ürün üretme cezası (artırıldı)
-                        reward -= self.reward_params.get("penalty_defective_product", 15.0)
-                    else:
-                        # Başarılı ürün üretimi
-                        reward += self.reward_params["reward_per_good_part"]
-                        reward += self.reward_params.get("reward_successful_part", 1.0)
-                        self.produced_good_parts += 1
-                        
-                        # Kilometre taşı bonusları
-                        target = self.target_production_per_day
-                        bonus_50 = self.reward_params.get("bonus_reach_50_percent", 0.0)
-                        bonus_80 = self.reward_params.get("bonus_reach_80_percent", 0.0)
-                        
-                        if not self.reached_50_percent and self.produced_good_parts >= 0.5 * target:
-                            reward += bonus_50
-                            self.reached_50_percent = True
-                        
-                        if not self.reached_80_percent and self.produced_good_parts >= 0.8 * target:
-                            reward += bonus_80
-                            self.reached_80_percent = True
+                operator_id = int(self.machine_op[m_id])
+                if operator_id >= 0:
+                    # Makine her durumda (normal, arıza, bakım) meşgul olmaktan çıkıyor
+                    self._busy_count -= 1
+
+                    # Çalışma süresi, yorgunluk, kapasite aşımı, beceri bazlı ödüller, hatalı/sağlam
+                    # parça ve kilometre taşı bonusları tek bir derlenmiş çekirdek çağrısında.
+                    # Hata zarı yukarıda _roll_events'te diğer zarlarla birlikte çekildi.
+                    (
+                        reward,
+                        self.produced_good_parts,
+                        self.reached_50_percent,
+                        self.reached_80_percent,
+                    ) = finish_part_kernel(
+                        reward,
+                        defect_u[i],
+                        operator_id,
+                        self.machine_type_index[m_id],
+                        self.current_shift_index,
+                        self.skill_matrix,
+                        self.effective_process_time,
+                        self.operator_work_minutes_per_shift,
+                        self.operator_shift_capacity_minutes,
+                        self.operator_fatigue_level,
+                        self._finish_params,
+                        self.produced_good_parts,
+                        self.target_production_per_day,
+                        self.reached_50_percent,
+                        self.reached_80_percent,
+                    )
                     
                     # Serbest bırakmadan ÖNCE history snapshot'ı kaydet
                     self._record_snapshot()
                     
-                    # Makine arıza/bakım kontrolü (işlem bitince)
-                    # Önce arıza kontrolü (daha ciddi)
-                    if self._check_machine_breakdown(m_id):
-                        # Arıza yaptı, makineyi serbest bırak ama operatörü de serbest bırak
-                        m["current_operator_id"] = None
-                        self.operators[operator_id]["status"] = "idle"
-                        self.operators[operator_id]["current_machine_id"] = None
-                        del self.machine_processing_remaining[m_id]
-                        continue  # Arıza durumunda makine kullanılamaz
-                    # Sonra bakım kontrolü
-                    elif self._check_machine_maintenance(m_id):
-                        # Bakıma girdi, makineyi serbest bırak ama operatörü de serbest bırak
-                        m["current_operator_id"] = None
-                        self.operators[operator_id]["status"] = "idle"
-                        self.operators[operator_id]["current_machine_id"] = None
-                        del self.machine_processing_remaining[m_id]
-                        continue  # Bakım durumunda makine kullanılamaz
+                    # Makine arıza/bakım kontrolü (işlem bitince; arıza bakımdan önce gelir)
+                    if downtime_mask[i]:
+                        # Makine kullanılamaz, operatörü serbest bırak
+                        self._start_downtime(m_id, operator_id, breakdowns[i], downtime_minutes[i])
+                        continue
                     
                     # Normal durum: Operatörü ve makineyi serbest bırak
-                    m["status"] = "idle"
-                    m["current_operator_id"] = None
-                    self.operators[operator_id]["status"] = "idle"
-                    self.operators[operator_id]["current_machine_id"] = None
-                    del self.machine_processing_remaining[m_id]
-        
-        # Boş makine cezası - sadece kullanılabilir makineler için
-        idle_count = 0
-        for i, m in enumerate(self.machines):
-            is_down = self.machine_down_until[i] is not None and self.current_time_minutes < self.machine_down_until[i]
-            if m["status"] == "idle" and not is_down:
-                idle_count += 1
-        reward -= self.reward_params.get("penalty_machine_idle", 10.0) * idle_count
+                    self.machine_status[m_id] = MACHINE_IDLE
+                    self.machine_op[m_id] = -1
+                    self.operator_status[operator_id] = OPERATOR_IDLE
+                    self.operator_machine[operator_id] = -1
+                    self.machine_time_remaining[m_id] = np.inf
+        
+        # Boş makine cezası - sadece kullanılabilir makineler için. Arıza/bakımdaki makineler
+        # süreleri bitene kadar BROKEN/MAINTENANCE durumunda kaldığı için boş ve kullanılabilir
+        # makineler = toplam - meşgul - arızalı/bakımda; sayaçlar atama ve serbest bırakma
+        # yerlerinde güncellendiği için burada makineler üzerinde ikinci bir tarama gerekmiyor.
+        idle_count = self.num_machines - self._busy_count - self._down_count
+        reward -= self._r_machine_idle * idle_count
         
         # Makine boş kalmadan önce operatör atama ödülü (eğer boş makine yoksa)
-        if idle_count == 0 and len([m for m in self.machines if m["status"] == "busy"]) > 0:
-            reward += self.reward_params.get("reward_prevent_idle", 5.0)
+        if idle_count == 0 and self._busy_count > 0:
+            reward += self._r_prevent_idle
         
         # Episode bitip bitmediğini kontrol et
         done = self.current_time_minutes >= self.day_duration_minutes
@@ -730,10 +822,10 @@ class FactoryEnv:
         # Terminal ödül ayarlaması
         if done:
             if self.produced_good_parts >= self.target_production_per_day:
-                reward += self.reward_params["goal_bonus"]
+                reward += self._r_goal_bonus
             else:
                 shortfall = self.target_production_per_day - self.produced_good_parts
-                reward -= self.reward_params["shortfall_penalty_scale"] * shortfall
+                reward -= self._r_shortfall_scale * shortfall
         
         # NOT: Otomatik operatör atamaları kaldırıldı
         # Tüm kararlar ajan tarafından verilmeli (Q-learning prensibi)
@@ -4,6 +4,10 @@ Eğitilmiş Q-learning ajanı için değerlendirme script'i.
 Bu script, eğitilmiş ajanı greedy politika ile test eder ve sonuçları gösterir.
 """
 
+import os
+from itertools import chain
+from multiprocessing import Pool
+
 import numpy as np
 from pathlib import Path
 
@@ -43,12 +47,10 @@ def run_greedy_episode(env: FactoryEnv, agent: QLearningAgent, record_history: b
     while not done:
         # Tamamen greedy politika: en yüksek Q-değerine sahip eylemi seç
         # Durum görülmemişse, varsayılan olarak eylem 0
-        if state in agent.Q:
-            q_values = {a: agent.Q[state].get(a, 0.0) for a in range(agent.num_actions)}
-            max_q = max(q_values.values())
-            best_actions = [a for a, q in q_values.items() if q == max_q]
-            # Aynı Q-değerine sahip birden fazla eylem varsa, ilkini seç
-            action = best_actions[0]
+        q_values = agent.q_values(state)
+        if q_values is not None:
+            # Aynı Q-değerine sahip birden fazla eylem varsa argmax ilkini seçiyor
+            action = int(q_values.argmax())
         else:
             # Durum daha önce hiç görülmemiş, varsayılan olarak eylem 0
             action = 0
@@ -60,14 +62,29 @@ def run_greedy_episode(env: FactoryEnv, agent: QLearningAgent, record_history: b
     return total_return, env.produced_good_parts
 
 
+# Paralel değerlendirmede her worker süreci ajanı bir kez yüklüyor (Q-tablosu salt-okunur)
+_worker_agent = None
+
+
+def _init_worker(q_table_path: str) -> None:
+    """Pool initializer: worker sürecinin ajanını kurup Q-tablosunu yükler."""
+    global _worker_agent
+    config = get_demo_config()
+    _worker_agent = QLearningAgent(num_actions=config["num_operators"] + 1)
+    _worker_agent.load_h5(q_table_path)
+
+
+def _run_seeded_episode(seed: int):
+    """Verilen seed'le kurulan taze bir ortamda tek greedy episode (worker'da çalışıyor)."""
+    env = FactoryEnv(get_demo_config(), seed=seed)
+    return run_greedy_episode(env, _worker_agent)
+
+
 def main():
     """Ana değerlendirme fonksiyonu."""
     # Yapılandırmayı yükle
     config = get_demo_config()
     
-    # Ortamı oluştur
-    env = FactoryEnv(config, seed=123)  # Değerlendirme için farklı tohum
-    
     # Eylem sayısını belirle
     num_actions = config["num_operators"] + 1
     
@@ -83,7 +100,7 @@ def main():
     
     agent.load_h5(str(q_table_path))
     print(f"Q-tablosu {q_table_path} dosyasından yüklendi")
-    print(f"Q-tablosundaki durum-eylem çifti sayısı: {sum(len(actions) for actions in agent.Q.values())}")
+    print(f"Q-tablosundaki durum-eylem çifti sayısı: {agent.num_state_action_pairs()}")
     print("-" * 50)
     
     # Değerlendirme episode'larını çalıştır
@@ -92,21 +109,26 @@ def main():
     
     eval_returns = []
     eval_productions = []
-    history = None  # İlk episode'dan history'yi sakla
     
-    for episode in range(num_eval_episodes):
-        # Sadece ilk episode için history kaydet
-        if episode == 0:
-            total_return, produced_parts = run_greedy_episode(env, agent, record_history=True)
-            history = env.get_history()  # İlk episode'dan hemen sonra history'yi al
-        else:
-            total_return, produced_parts = run_greedy_episode(env, agent, record_history=False)
-        
-        eval_returns.append(total_return)
-        eval_productions.append(produced_parts)
-        
-        if (episode + 1) % 10 == 0:
-            print(f"Episode {episode + 1:3d}: return={total_return:7.2f}, üretilen={produced_parts:3d}")
+    # Episode'lar birbirinden bağımsız: her biri kendi seed'iyle ayrı bir ortamda koşuyor,
+    # böylece sonuçlar worker sayısından (ve sırasından) bağımsız
+    episode_seeds = [123 + episode for episode in range(num_eval_episodes)]  # Değerlendirme için farklı tohum
+    
+    # İlk episode history (GIF) için ana süreçte koşuyor
+    env = FactoryEnv(config, seed=episode_seeds[0])
+    first_result = run_greedy_episode(env, agent, record_history=True)
+    history = env.get_history()
+    
+    # Kalanlar worker süreçlerine dağıtılıyor
+    num_workers = os.cpu_count() or 1
+    with Pool(num_workers, initializer=_init_worker, initargs=(str(q_table_path),)) as pool:
+        results = chain([first_result], pool.imap(_run_seeded_episode, episode_seeds[1:], chunksize=4))
+        for episode, (total_return, produced_parts) in enumerate(results):
+            eval_returns.append(total_return)
+            eval_productions.append(produced_parts)
+            
+            if (episode + 1) % 10 == 0:
+                print(f"Episode {episode + 1:3d}: return={total_return:7.2f}, üretilen={produced_parts:3d}")
     
     print("-" * 50)
     print("Değerlendirme Özeti:")
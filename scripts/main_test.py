@@ -7,6 +7,10 @@ greedy politika ile test eder ve özet istatistikler ile bir adet GIF üretir.
 Bu dosya, eğitimden sonra hızlıca "öğrendi mi?" sorusuna cevap vermek için tasarlandı.
 """
 
+import os
+from itertools import chain
+from multiprocessing import Pool
+
 import numpy as np
 from pathlib import Path
 from typing import Dict
@@ -38,11 +42,10 @@ def run_greedy_episode(env: FactoryEnv, agent: QLearningAgent, record_history: b
 
     while not done and step_count < max_steps:
         # Durum daha önce görülmüşse en yüksek Q-değerine sahip eylemi seç
-        if state in agent.Q and agent.Q[state]:
-            q_values = agent.Q[state]
-            # Sadece tanımlı eylemler üzerinden argmax al
-            best_action = max(q_values, key=q_values.get)
-            action = best_action
+        q_values = agent.q_values(state)
+        if q_values is not None and q_values.any():
+            # Sadece tanımlı (sıfır olmayan) eylemler üzerinden argmax al; eşitlikte ilki
+            action = int(np.where(q_values != 0.0, q_values, -np.inf).argmax())
         else:
             # Durum hiç görülmemişse veya Q-tablosunda bu durum için hiç eylem yoksa,
             # varsayılan olarak eylem 0'ı seç (en sade fallback).
@@ -61,10 +64,27 @@ def run_greedy_episode(env: FactoryEnv, agent: QLearningAgent, record_history: b
     }
 
 
+# Paralel testte her worker süreci ajanı bir kez yüklüyor (Q-tablosu salt-okunur)
+_worker_agent = None
+
+
+def _init_worker(q_table_path: str) -> None:
+    """Pool initializer: worker sürecinin ajanını kurup Q-tablosunu yükler."""
+    global _worker_agent
+    config = get_demo_config()
+    _worker_agent = QLearningAgent(num_actions=config["num_operators"] + 1)
+    _worker_agent.load_h5(q_table_path)
+
+
+def _run_seeded_episode(seed: int) -> Dict:
+    """Verilen seed'le kurulan taze bir ortamda tek greedy episode (worker'da çalışıyor)."""
+    env = FactoryEnv(get_demo_config(), seed=seed)
+    return run_greedy_episode(env, _worker_agent)
+
+
 def main() -> None:
     """Ana test fonksiyonu (greedy politika ile hızlı test)."""
     config = get_demo_config()
-    env = FactoryEnv(config, seed=123)  # Test için sabit seed
 
     num_actions = config["num_operators"] + 1
     agent = QLearningAgent(num_actions=num_actions)
@@ -78,7 +98,7 @@ def main() -> None:
 
     agent.load_h5(str(q_table_path))
     print(f"Q-tablosu {q_table_path} dosyasından yüklendi")
-    print(f"Q-tablosundaki durum-eylem çifti sayısı: {sum(len(a) for a in agent.Q.values())}")
+    print(f"Q-tablosundaki durum-eylem çifti sayısı: {agent.num_state_action_pairs()}")
     print("-" * 70)
 
     # Test parametreleri
@@ -86,20 +106,27 @@ def main() -> None:
     print(f"{num_test_episodes} test episode'ı çalıştırılıyor (greedy politika)...\n")
 
     results = []
-    history = None
 
-    for episode in range(num_test_episodes):
-        # Sadece ilk episode için history kaydı aç (GIF için)
-        record_history = (episode == 0)
-        result = run_greedy_episode(env, agent, record_history=record_history)
-        results.append(result)
+    # Her episode kendi seed'iyle ayrı bir ortamda koşuyor; sonuçlar worker sayısından bağımsız
+    episode_seeds = [123 + episode for episode in range(num_test_episodes)]  # Test için sabit seed'ler
 
-        if record_history:
-            history = env.get_history()
+    # Sadece ilk episode için history kaydı aç (GIF için); o yüzden o ana süreçte koşuyor
+    env = FactoryEnv(config, seed=episode_seeds[0])
+    # GIF için history'yi kayıt sırasında en fazla 400 frame'e seyrelt (performans için)
+    env.history_max_frames = 400
+    first_result = run_greedy_episode(env, agent, record_history=True)
+    history = env.get_history()
 
-        if (episode + 1) % 10 == 0:
-            avg_last = np.mean([r["produced_parts"] for r in results[-10:]])
-            print(f"Episode {episode + 1:3d}: son 10 bölüm ort. üretim = {avg_last:5.1f}")
+    # Kalan episode'lar worker süreçlerine dağıtılıyor
+    num_workers = os.cpu_count() or 1
+    with Pool(num_workers, initializer=_init_worker, initargs=(str(q_table_path),)) as pool:
+        episode_results = chain([first_result], pool.imap(_run_seeded_episode, episode_seeds[1:], chunksize=4))
+        for episode, result in enumerate(episode_results):
+            results.append(result)
+
+            if (episode + 1) % 10 == 0:
+                avg_last = np.mean([r["produced_parts"] for r in results[-10:]])
+                print(f"Episode {episode + 1:3d}: son 10 bölüm ort. üretim = {avg_last:5.1f}")
 
     # Özet istatistikler
     print("\n" + "=" * 70)
@@ -142,13 +169,6 @@ def main() -> None:
         output_dir = Path("outputs")
         output_dir.mkdir(exist_ok=True)
 
-        # History çok uzunsa hafifçe örnekle (performans için)
-        max_frames = 400
-        if len(history) > max_frames:
-            step = max(1, len(history) // max_frames)
-            history = history[::step]
-            print(f"\nHistory örneklenerek {len(history)} frame'e düşürüldü (GIF için).")
-
         print("\nGIF oluşturuluyor...")
         render_timeline_gif(
             history=history,
@@ -6,7 +6,6 @@ Q-tablosunu ve bazı grafik / GIF çıktıları kaydediyorum.
 """
 
 import numpy as np
-import matplotlib.pyplot as plt
 from pathlib import Path
 
 from config.demo_config import get_demo_config
@@ -46,15 +45,16 @@ def main():
     # GIF için history kaydedilecek episode'lar (her 100. episode, 100'den başlayarak)
     # Sadece bu episode'lar arasından "en iyi" olan için GIF üreteceğiz
     history_episode_indices = list(range(99, num_episodes, 100))  # 99 = episode 100 (0-indeksli)
+    history_episode_set = set(history_episode_indices)  # Üyelik testi için (liste sadece log'da)
     
     # En iyi episode'un history'sini saklamak için değişkenler
     best_episode_index = None
     best_episode_return = None
     best_episode_history = None
     
-    # Takip listeleri
-    episode_returns = []
-    episode_productions = []
+    # Takip dizileri (episode sayısı baştan belli; liste büyütmek yerine önceden ayır)
+    episode_returns = np.zeros(num_episodes, dtype=np.float64)
+    episode_productions = np.zeros(num_episodes, dtype=np.int32)
     
     print("Eğitim başlatılıyor...")
     print(f"Episode sayısı: {num_episodes}")
@@ -65,28 +65,26 @@ def main():
     # Eğitim döngüsü
     for episode in range(num_episodes):
         # GIF üretimi için her 100. episode'da history kaydet (episode 100'den başlayarak)
-        if episode in history_episode_indices:
-            state = env.reset(record_history=True)
-        else:
-            state = env.reset(record_history=False)
+        record_history = episode in history_episode_set
+        state = env.reset(record_history=record_history)
         
         done = False
         episode_return = 0.0
         
+        action = agent.select_action(state, episode)
         while not done:
-            action = agent.select_action(state, episode)
             next_state, reward, done, info = env.step(action)
-            # Episode indeksini de vererek dinamik learning rate kullanımını etkinleştir
-            agent.update(state, action, reward, next_state, done, episode_index=episode)
+            # Güncelleme + bir sonraki eylem seçimi tek çağrıda (dinamik learning rate için episode indeksi veriliyor)
+            action = agent.learn_and_select(state, action, reward, next_state, done, episode)
             episode_return += reward
             state = next_state
         
         # Episode istatistiklerini kaydet
-        episode_returns.append(episode_return)
-        episode_productions.append(env.produced_good_parts)
+        episode_returns[episode] = episode_return
+        episode_productions[episode] = env.produced_good_parts
         
         # Kaydedilen episode'ların history'sini al ve en iyi episode'u takip et
-        if episode in history_episode_indices:
+        if record_history:
             history = env.get_history()
             if history:
                 # Her frame'e tanımlama için episode numarası ekle
@@ -103,8 +101,9 @@ def main():
         
         # İlerlemeyi yazdır (log gürültüsünü azaltmak için her 100 episode'da bir)
         if (episode + 1) % 100 == 0 or episode == 0:
-            avg_return = np.mean(episode_returns[-100:]) if len(episode_returns) >= 100 else episode_return
-            avg_production = np.mean(episode_productions[-100:]) if len(episode_productions) >= 100 else env.produced_good_parts
+            window = slice(episode - 99, episode + 1)
+            avg_return = episode_returns[window].mean() if episode >= 99 else episode_return
+            avg_production = episode_productions[window].mean() if episode >= 99 else env.produced_good_parts
             epsilon = agent.get_epsilon(episode)
             print(f"Episode {episode + 1:4d}: "
                   f"return={episode_return:7.2f}, "
@@ -115,15 +114,15 @@ def main():
     
     print("-" * 50)
     print("Eğitim tamamlandı!")
-    print(f"Son ortalama return (son 100 episode): {np.mean(episode_returns[-100:]):.2f}")
-    print(f"Son ortalama üretim (son 100 episode): {np.mean(episode_productions[-100:]):.1f}")
+    print(f"Son ortalama return (son 100 episode): {episode_returns[-100:].mean():.2f}")
+    print(f"Son ortalama üretim (son 100 episode): {episode_productions[-100:].mean():.1f}")
     
     # Q-tablosunu her iki formatta kaydet
-    q_table_pkl_path = "q_table.pkl"
+    q_table_npz_path = "q_table.npz"
     q_table_h5_path = "q_table.h5"
-    agent.save(q_table_pkl_path)
+    agent.save(q_table_npz_path)
     agent.save_h5(q_table_h5_path)
-    print(f"Q-tablosu {q_table_pkl_path} dosyasına kaydedildi (pickle formatı)")
+    print(f"Q-tablosu {q_table_npz_path} dosyasına kaydedildi (NumPy .npz formatı)")
     print(f"Q-tablosu {q_table_h5_path} dosyasına kaydedildi (HDF5 formatı)")
     
     # Eğitim eğrilerini çiz
@@ -0,0 +1,20 @@
+"""
+İsteğe bağlı Numba desteği.
+
+Numba kuruluysa sıcak döngüdeki küçük sayısal fonksiyonlar `njit` ile derleniyor.
+Kurulu değilse aynı fonksiyonlar düz Python olarak çalışıyor; sonuç değişmiyor,
+sadece biraz daha yavaş oluyor.
+"""
+
+try:
+    from numba import njit
+
+    NUMBA_AVAILABLE = True
+except ImportError:  # Numba yoksa dekoratör hiçbir şey yapmasın
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Numba'nın `njit` dekoratörünün yerine geçen etkisiz sürüm."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
@@ -5,9 +5,47 @@ Bu modül, eğitim sırasında episode return'leri ve üretim sayılarını
 görselleştirmek için yardımcı fonksiyonlar içerir.
 """
 
+import matplotlib
+
+# Grafikler sadece dosyaya yazılıyor; GUI backend'i aramasın/yüklemesin (pyplot'tan önce olmalı)
+matplotlib.use("Agg")
+
 import matplotlib.pyplot as plt
+import numpy as np
 from pathlib import Path
-from typing import List
+from typing import List, Sequence
+
+
+# Eğitim eğrilerinde çizilecek en fazla nokta sayısı (yaklaşık)
+_MAX_PLOT_POINTS = 2000
+
+
+def _moving_average(values: Sequence[float], window_size: int) -> np.ndarray:
+    """
+    Geriye doğru hareketli ortalama; ilk window_size-1 noktada o ana kadarki ortalama.
+
+    Her noktada dilim toplamı almak yerine kümülatif toplamın farkını kullanıyorum (O(N)).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    cumsum = np.concatenate(([0.0], np.cumsum(values)))
+    head = cumsum[1:window_size] / np.arange(1, min(window_size, values.size + 1))
+    tail = (cumsum[window_size:] - cumsum[:-window_size]) / window_size
+    return np.concatenate((head, tail))
+
+
+def _plot_downsampled(series: np.ndarray, max_points: int = _MAX_PLOT_POINTS, **kwargs) -> None:
+    """
+    Seriyi en fazla ~max_points noktaya seyrelterek çizer (x ekseni gerçek episode indeksleri).
+
+    Hareketli ortalama zaten pürüzsüz olduğu için adım adım atlamak görüntüyü bozmuyor;
+    Agg'ye giden nokta sayısı ve PNG çizim süresi ise episode sayısından bağımsız kalıyor.
+    Son episode adıma denk gelmese bile ekleniyor ki eğri gerçek son değerde bitsin.
+    """
+    stride = max(1, len(series) // max_points)
+    indices = np.arange(0, len(series), stride)
+    if indices[-1] != len(series) - 1:
+        indices = np.append(indices, len(series) - 1)
+    plt.plot(indices, np.asarray(series)[indices], **kwargs)
 
 
 def plot_training_curves(episode_returns: List[float], episode_productions: List[int], output_dir: str) -> None:
@@ -30,11 +68,8 @@ def plot_training_curves(episode_returns: List[float], episode_productions: List
     # Hareketli ortalama ekle (gürültüyü azaltmak için daha büyük window)
     window_size = 200  # 100'den 200'e çıkarıldı → daha pürüzsüz bir plato
     if len(episode_returns) >= window_size:
-        moving_avg = []
-        for i in range(len(episode_returns)):
-            start = max(0, i - window_size + 1)
-            moving_avg.append(sum(episode_returns[start:i+1]) / (i - start + 1))
-        plt.plot(moving_avg, linewidth=2.5, label=f'Hareketli Ortalama ({window_size} episode)', color='red')
+        moving_avg = _moving_average(episode_returns, window_size)
+        _plot_downsampled(moving_avg, linewidth=2.5, label=f'Hareketli Ortalama ({window_size} episode)', color='red')
     else:
         # Episode sayısı azsa, ham veriyi tek başına çiz (erken testler için)
         plt.plot(episode_returns, alpha=0.4, linewidth=0.8, label='Episode Return', color='lightblue')
@@ -52,11 +87,8 @@ def plot_training_curves(episode_returns: List[float], episode_productions: List
     plt.figure(figsize=(10, 6))
     # Ham üretim eğrisi yerine ağırlıklı olarak hareketli ortalamayı göster
     if len(episode_productions) >= window_size:
-        moving_avg = []
-        for i in range(len(episode_productions)):
-            start = max(0, i - window_size + 1)
-            moving_avg.append(sum(episode_productions[start:i+1]) / (i - start + 1))
-        plt.plot(moving_avg, linewidth=2.5, label=f'Hareketli Ortalama ({window_size} episode)', color='red')
+        moving_avg = _moving_average(episode_productions, window_size)
+        _plot_downsampled(moving_avg, linewidth=2.5, label=f'Hareketli Ortalama ({window_size} episode)', color='red')
     else:
         plt.plot(episode_productions, alpha=0.4, linewidth=0.8, label='Üretilen İyi Parça', color='lightgreen')
     
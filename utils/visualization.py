@@ -5,9 +5,82 @@ Bu modül, operatör atamalarını zaman içinde gösteren GIF animasyonları
 oluşturmak için yardımcı fonksiyonlar içerir.
 """
 
-import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation, PillowWriter
-from typing import List, Dict, Any
+import os
+import shutil
+import subprocess
+from multiprocessing import Pool
+
+import matplotlib
+
+# GIF'ler sadece dosyaya yazılıyor; plotting.py'deki gibi Agg kullan
+matplotlib.use("Agg")
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import PatchCollection
+from matplotlib.colors import to_rgba_array
+from matplotlib.figure import Figure
+from matplotlib.font_manager import FontProperties
+from matplotlib.patches import Rectangle
+from matplotlib.path import Path
+from matplotlib.transforms import Affine2D
+from PIL import GifImagePlugin, Image
+from typing import List, Dict, Any, Optional, Tuple
+
+try:
+    import pyvips
+except (ImportError, OSError):  # pyvips ya da libvips yoksa GIF'ler Pillow ile yazılıyor
+    pyvips = None
+
+
+# Makine durumu -> (etiket, renk); history'deki "idle" ve bilinmeyen durumlar "Boşta"
+_STATUS_MAP = {
+    "busy": ("Çalışıyor", "green"),
+    "broken": ("Arızalı", "red"),
+    "maintenance": ("Bakım", "orange"),
+    None: ("Boşta", "gray"),
+}
+_STATUS_IDLE = _STATUS_MAP[None]
+_STATUS_BUSY = _STATUS_MAP["busy"]
+
+# Her operatör için farklı renkler tanımla
+# Görsel olarak farklı basit bir renk paleti kullanıyoruz
+_OPERATOR_COLORS = (
+    '#FF6B6B',  # Kırmızı
+    '#4ECDC4',  # Teal
+    '#45B7D1',  # Mavi
+    '#FFA07A',  # Açık Somon
+    '#98D8C8',  # Nane
+    '#F7DC6F',  # Sarı
+    '#BB8FCE',  # Mor
+    '#85C1E2',  # Gökyüzü Mavisi
+)
+
+# Makine karesindeki yazının iki stili ("Idle" / "O3"); her frame'de boyut, stil ve
+# kalınlığı ayrı ayrı ayarlamak yerine hazır FontProperties tek çağrıyla veriliyor
+_FONT_MACHINE_IDLE = FontProperties(size=9, style='italic')
+_FONT_MACHINE_BUSY = FontProperties(size=10, weight='bold')
+
+# Video çıktısı: dosya uzantısı -> (ffmpeg codec'i, ek ffmpeg argümanları)
+_VIDEO_CODECS = {
+    ".mp4": ("libx264", ["-preset", "veryfast"]),
+    ".webm": ("libvpx-vp9", ["-deadline", "realtime", "-cpu-used", "8"]),
+}
+
+# Paralel çizimde worker başına en az bu kadar frame düşsün; daha kısa history'lerde
+# süreç başlatma ve figür kurma maliyeti kazancı yiyor
+_MIN_FRAMES_PER_WORKER = 50
+# Paralel çizimde worker'lara tek seferde verilen snapshot sayısı; küçük tutuluyor ki
+# frame'ler ana süreçte birikmeden yazıcıya akabilsin
+_RENDER_CHUNKSIZE = 8
+
+# GIF paleti: sahnede ~10 düz renk + yazıların kenar yumuşatması var, 64 renk yetiyor
+_GIF_COLORS = 64
+
+# pyvips kuruluysa bu kadar frame'e kadar GIF libvips ile yazılıyor. libvips tüm
+# animasyonu tek görüntü olarak istiyor (frame'ler bellekte birikiyor); daha uzun
+# history'lerde akışlı Pillow yazıcısı kullanılıyor.
+_VIPS_MAX_FRAMES = 1000
 
 
 def render_timeline_gif(
@@ -16,6 +89,12 @@ def render_timeline_gif(
     output_path: str,
     title: str = "Fabrika Operatör Ataması",
     fps: int = 10,  # Daha hızlı animasyon için artırıldı
+    frame_stride: int = 1,
+    skip_unchanged: bool = False,
+    optimize: bool = True,
+    figsize: Tuple[float, float] = (10, 6),
+    dpi: int = 80,
+    num_workers: Optional[int] = None,
 ) -> None:
     """
     Zaman içinde hangi operatörün hangi makinede çalıştığını gösteren bir GIF animasyonu oluşturur.
@@ -39,9 +118,23 @@ def render_timeline_gif(
             * "operator_skills": list[float] - her makine için beceri skoru veya boş için -1.0
             * "produced_good_parts": int - şu ana kadar üretilen toplam iyi parça
         config: Yapılandırma sözlüğü (num_machines, num_operators vb. bilmek için kullanılır)
-        output_path: GIF'i kaydetmek için yer (örn., "outputs/training_run.gif")
+        output_path: GIF'i kaydetmek için yer (örn., "outputs/training_run.gif"). Uzantı
+            .mp4 / .webm ise ffmpeg ile video yazılır (ffmpeg yoksa aynı isimle .gif;
+            ffmpeg çalışıp hata verirse RuntimeError).
         title: Animasyon için başlık string'i
         fps: GIF için saniye başına frame (varsayılan: 8, daha hızlı animasyon için)
+        frame_stride: Her frame_stride'ıncı snapshot çizilir (varsayılan 1: hepsi)
+        skip_unchanged: True ise atamaları, makine durumları ve vardiyası bir önceki
+            çizilen frame'le aynı olan snapshot'lar atlanır. Başlıktaki saat ve parça
+            sayısı atlanan aralık kadar ileri sıçrar.
+        optimize: True ise ve sistemde gifsicle varsa, kaydedilen GIF yerinde sıkıştırılır
+            (-O3 --lossy=30). gifsicle yoksa sessizce atlanır.
+        figsize: Figür boyutu (inç)
+        dpi: Çözünürlük. Agg'nin frame başına işi piksel sayısıyla orantılı; eskiden
+            matplotlib varsayılanı 100 dpi (1000x600) kullanılıyordu, 80 dpi ile 800x480.
+        num_workers: Frame'leri çizen süreç sayısı (None: CPU sayısı). Worker başına en az
+            _MIN_FRAMES_PER_WORKER frame düşmüyorsa daha az süreç (gerekirse sadece bu süreç)
+            kullanılıyor.
     """
     num_machines = config["num_machines"]
     num_operators = config["num_operators"]
@@ -51,143 +144,119 @@ def render_timeline_gif(
         print("Uyarı: Boş history, GIF oluşturulamaz")
         return
     
-    # Her operatör için farklı renkler tanımla
-    # Görsel olarak farklı basit bir renk paleti kullanıyoruz
-    operator_colors = [
-        '#FF6B6B',  # Kırmızı
-        '#4ECDC4',  # Teal
-        '#45B7D1',  # Mavi
-        '#FFA07A',  # Açık Somon
-        '#98D8C8',  # Nane
-        '#F7DC6F',  # Sarı
-        '#BB8FCE',  # Mor
-        '#85C1E2',  # Gökyüzü Mavisi
-    ]
-    # Operatör sayısı renk sayısından fazlaysa genişlet
-    while len(operator_colors) < num_operators:
-        operator_colors.extend(operator_colors)
+    # Çizilecek frame sayısını azalt: önce adımla seyrelt, sonra (istenirse) görüntüde
+    # değişiklik olmayan ardışık frame'leri at. Son snapshot her zaman tutuluyor ki
+    # GIF bölüm sonundaki sayaçla bitsin.
+    if frame_stride > 1:
+        history = history[::frame_stride] + ([history[-1]] if (len(history) - 1) % frame_stride else [])
+    if skip_unchanged:
+        filtered = []
+        prev_key = None
+        for snapshot in history:
+            key = (
+                tuple(snapshot["machine_assignments"]),
+                tuple(snapshot.get("machine_statuses") or ()),
+                snapshot.get("shift_index"),
+            )
+            if key != prev_key:
+                filtered.append(snapshot)
+                prev_key = key
+        if filtered[-1] is not history[-1]:
+            filtered.append(history[-1])
+        history = filtered
+    
+    # Video istendiyse ffmpeg lazım; yoksa uyarıp GIF'e düş
+    stem, suffix = os.path.splitext(output_path)
+    video = _VIDEO_CODECS.get(suffix.lower())
+    ffmpeg = shutil.which(matplotlib.rcParams["animation.ffmpeg_path"])
+    if video is not None and ffmpeg is None:
+        output_path = stem + ".gif"
+        print(f"Uyarı: ffmpeg bulunamadı, video yerine GIF yazılıyor ({output_path})")
+        video = None
+    
+    # Sahne parametreleri düz değerler: paralel çizimde worker'lara olduğu gibi gönderiliyor
+    # (config bir MappingProxyType olabiliyor, o pickle edilemiyor)
+    scene_args = (num_machines, num_operators, title, figsize, dpi)
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+    num_workers = min(num_workers, len(history) // _MIN_FRAMES_PER_WORKER)
+    
+    if num_workers > 1:
+        # Frame'ler birbirinden bağımsız ve update() sahnenin tamamını yeniden ayarlıyor:
+        # her worker kendi figürünü bir kez kuruyor, snapshot'lar küçük parçalar halinde
+        # dağıtılıyor. imap sırayı koruyor; frame'ler geldikçe yazılıyor.
+        with Pool(num_workers, initializer=_init_render_worker, initargs=(scene_args,)) as pool:
+            frames = pool.imap(_render_snapshot, history, chunksize=_RENDER_CHUNKSIZE)
+            _save_frames(frames, len(history), output_path, fps, video, ffmpeg, optimize)
+    else:
+        scene = _TimelineScene(*scene_args)
+        frames = (scene.render(snapshot) for snapshot in history)
+        _save_frames(frames, len(history), output_path, fps, video, ffmpeg, optimize)
+    
+    kind = "Video" if video is not None else "GIF"
+    print(f"{kind} {output_path} dosyasına kaydedildi ({len(history)} frame)")
+
+
+class _TimelineScene:
+    """
+    render_timeline_gif'in çizdiği sahne.
     
-    # Figürü başlat
-    fig, ax = plt.subplots(figsize=(10, 6))
-    plt.close(fig)  # Etkileşimli olmayan ortamlarda göstermemek için kapat
+    Her frame'de ax.clear() yapıp tüm kare/daire/yazıları baştan kurmak yerine
+    artist'ler bir kez oluşturuluyor; update() sadece konum/renk/yazı değiştiriyor.
+    Sınıf olarak durmasının sebebi paralel çizim: her worker süreci kendi sahnesini
+    kuruyor (figürler süreçler arasında taşınamıyor).
+    """
     
-    def update(frame_idx: int):
-        """Animasyon frame'leri için güncelleme fonksiyonu."""
-        ax.clear()
+    def __init__(self, num_machines: int, num_operators: int, title: str,
+                 figsize: Tuple[float, float], dpi: int):
+        """Sabit sahneyi (makine kareleri, etiketler, eksenler) ve değişen artist'leri bir kez kurar."""
+        self.num_machines = num_machines
+        self.num_operators = num_operators
+        self.title = title
         
-        # Bu frame için snapshot al
-        snapshot = history[frame_idx]
-        machine_assignments = snapshot["machine_assignments"]
-        operator_skills = snapshot.get("operator_skills", [-1.0] * num_machines)
-        machine_statuses = snapshot.get("machine_statuses", None)
-        current_time = snapshot.get("time", 0.0)
-        shift_index = snapshot.get("shift_index", 0)
-        produced_parts = snapshot.get("produced_good_parts", 0)
-        episode_number = snapshot.get("episode_number", 0)
+        # Renkleri RGBA'ya bir kez çevir; operatör sayısı renk sayısından fazlaysa palet baştan tekrar ediyor
+        self.operator_face_rgba = np.resize(to_rgba_array(_OPERATOR_COLORS), (num_operators, 4))
+        self.operator_edge_rgba = np.zeros((num_operators, 4))  # Siyah kenar, alfa frame'de yazılıyor
+        # Boştaki operatörlerin park yerleri (x) sabit
+        self.parking_x = num_machines + np.arange(num_operators) * 0.4
+        
+        # Figürü başlat: pyplot yerine doğrudan Figure + Agg canvas. pyplot'un global figür
+        # yöneticisine kaydolmuyor, kapatmaya da gerek kalmıyor; frame'ler canvas'tan okunuyor.
+        fig = Figure(figsize=figsize, dpi=dpi)
+        self.canvas = FigureCanvasAgg(fig)
+        ax = fig.add_subplot(111)
+        self.fig = fig
+        self.ax = ax
+        
+        self.machine_op_labels = []
+        self.machine_status_labels = []
+        self.operator_labels = []
+        self.operator_skill_labels = []
+        
+        # Makineleri alt satırda (y=0) gri kareler olarak çiz; kareler hiç değişmediği için
+        # hepsi tek bir PatchCollection (tek çizim çağrısı)
+        machine_squares = [Rectangle((m_id - 0.3, -0.3), 0.6, 0.6) for m_id in range(num_machines)]
+        ax.add_collection(PatchCollection(machine_squares, facecolor='#cccccc', edgecolor='black', linewidth=2,
+                                       joinstyle='miter'))
         
-        # Makineleri alt satırda (y=0) gri kareler olarak çiz
         for m_id in range(num_machines):
-            # Makine karesini çiz
-            rect = plt.Rectangle((m_id - 0.3, -0.3), 0.6, 0.6,
-                               facecolor='#cccccc', edgecolor='black', linewidth=2)
-            ax.add_patch(rect)
-            
             # Makine adı (M0, M1, ...) - biraz yukarı alınmış
             ax.text(m_id, -0.45, f"M{m_id}", ha='center', va='top',
                    fontsize=10, fontweight='bold')
             
-            # Makinenin durumunu belirle (idle / busy / broken / maintenance)
-            status_text = ""
-            status_color = "gray"
-            if machine_statuses is not None and m_id < len(machine_statuses):
-                st = machine_statuses[m_id]
-                if st == "busy":
-                    status_text = "Çalışıyor"
-                    status_color = "green"
-                elif st == "broken":
-                    status_text = "Arızalı"
-                    status_color = "red"
-                elif st == "maintenance":
-                    status_text = "Bakım"
-                    status_color = "orange"
-                else:
-                    status_text = "Boşta"
-                    status_color = "gray"
-            else:
-                # History eski formatta ise, sadece operatör varlığına göre tahmin et
-                op_id_tmp = machine_assignments[m_id] if m_id < len(machine_assignments) else -1
-                if op_id_tmp == -1:
-                    status_text = "Boşta"
-                    status_color = "gray"
-                else:
-                    status_text = "Çalışıyor"
-                    status_color = "green"
-            
-            # Makinenin altına durum etiketini yaz (Boşta / Çalışıyor / Arızalı / Bakım)
-            ax.text(m_id, -0.8, status_text, ha='center', va='top',
-                   fontsize=8, color=status_color, style='italic')
+            # Makinenin altındaki durum etiketi (Boşta / Çalışıyor / Arızalı / Bakım)
+            self.machine_status_labels.append(ax.text(m_id, -0.8, "", ha='center', va='top',
+                                                      fontsize=8, color='gray', style='italic'))
             
-            # Makine karesi içinde mevcut operatörü veya "Idle" göster
-            op_id = machine_assignments[m_id] if m_id < len(machine_assignments) else -1
-            if op_id == -1:
-                # Makine boş (duruma göre Boşta/Arızalı/Bakım olabilir)
-                ax.text(m_id, 0, "Idle", ha='center', va='center',
-                       fontsize=9, color='gray', style='italic')
-            else:
-                # Makinede bir operatör var
-                ax.text(m_id, 0, f"O{op_id}", ha='center', va='center',
-                       fontsize=10, fontweight='bold', color='black')
-        
-        # Hangi operatörlerin makinelere atandığını ve becerilerini takip et
-        operator_to_machine = {}
-        operator_skill_on_machine = {}
-        for m_id, op_id in enumerate(machine_assignments):
-            if op_id != -1:
-                operator_to_machine[op_id] = m_id
-                # Bu operatörün bu makinedeki beceri skorunu al
-                skill = operator_skills[m_id] if m_id < len(operator_skills) else 0.0
-                operator_skill_on_machine[op_id] = skill
-        
-        # Operatörleri beceri bilgisiyle renkli daireler olarak çiz
+            # Makine karesi içindeki operatör ("O3") veya "Idle" yazısı
+            self.machine_op_labels.append(ax.text(m_id, 0, "", ha='center', va='center'))
+        
+        # Operatör etiketleri (konumları update() içinde ayarlanıyor)
         for op_id in range(num_operators):
-            color = operator_colors[op_id]
-            
-            if op_id in operator_to_machine:
-                # Operatör bir makinede çalışıyor
-                m_id = operator_to_machine[op_id]
-                x_pos = m_id
-                y_pos = 0.6
-                skill = operator_skill_on_machine.get(op_id, 0.0)
-                
-                # Operatör dairesini çiz (boyut beceriye göre - daha yüksek beceri = daha büyük daire)
-                # Aktif işçiler biraz daha büyük ve daha kalın kenarlı
-                circle_size = 0.14 + (skill * 0.08)  # Aralık: 0.14'ten 0.22'ye (0.12'den artırıldı)
-                circle = plt.Circle((x_pos, y_pos), circle_size, facecolor=color, 
-                                 edgecolor='black', linewidth=3, zorder=10, alpha=0.8)  # linewidth 2'den artırıldı
-                ax.add_patch(circle)
-                
-                # Operatörü beceri skoruyla etiketle
-                skill_text = f"O{op_id}\n{skill:.2f}" if skill >= 0 else f"O{op_id}"
-                ax.text(x_pos, y_pos, skill_text, ha='center', va='center',
-                       fontsize=8, fontweight='bold', color='white')
-                
-                # Beceri skorunu operatörün altında göster
-                ax.text(x_pos, y_pos - 0.25, f"skill:{skill:.2f}", ha='center', va='top',
-                       fontsize=7, color='black', style='italic')
-            else:
-                # Operatör boş - park alanına koy
-                parking_x = num_machines + (op_id * 0.4)
-                x_pos = parking_x
-                y_pos = 0.6
-                
-                # Operatör dairesini çiz (boşken daha küçük)
-                circle = plt.Circle((x_pos, y_pos), 0.12, facecolor=color, 
-                                 edgecolor='black', linewidth=1.5, zorder=10, alpha=0.5)
-                ax.add_patch(circle)
-                
-                # Operatörü etiketle
-                ax.text(x_pos, y_pos, f"O{op_id}", ha='center', va='center',
-                       fontsize=8, fontweight='bold', color='white')
+            self.operator_labels.append(ax.text(0.0, 0.6, "", ha='center', va='center',
+                                                fontsize=8, fontweight='bold', color='white'))
+            self.operator_skill_labels.append(ax.text(0.0, 0.35, "", ha='center', va='top',
+                                                      fontsize=7, color='black', style='italic'))
         
         # Park alanı etiketi çiz
         if num_operators > 0:
@@ -211,18 +280,306 @@ def render_timeline_gif(
         ax.set_xticks([])
         ax.set_yticks([])
         
+        # Başlık artist'i bir kez stillendiriliyor; update() sadece yazı değişince set_text yapıyor
+        ax.set_title("", fontsize=11, pad=10)
+        self._title_text = ""
+        
+        # Operatör daireleri: her biri ayrı Circle yerine tek bir scatter (PathCollection).
+        # Eskiden daireler veri koordinatındaydı, yani eksen oranı yüzünden dikey elips
+        # görünüyordu; marker'ı aynı oranda bir elips yapıp boyutu veri yarıçapından
+        # noktaya çeviriyorum ki görüntü değişmesin.
+        unit_box = ax.transData.transform([(0.0, 0.0), (1.0, 1.0)])
+        px_per_unit_x, px_per_unit_y = unit_box[1] - unit_box[0]
+        ellipse = Path.unit_circle().transformed(Affine2D().scale(px_per_unit_x / px_per_unit_y, 1.0))
+        # Yarıçap (veri birimi) -> marker boyutu (nokta^2); elipsin uzun ekseni sqrt(s) nokta
+        self.radius_to_points = 2.0 * px_per_unit_y * 72.0 / fig.dpi
+        self.operator_scatter = ax.scatter(
+            np.zeros(num_operators), np.full(num_operators, 0.6),
+            marker=ellipse, zorder=10,
+        )
+    
+    def render(self, snapshot: Dict[str, Any]) -> np.ndarray:
+        """Sahneyi snapshot'a göre günceller, çizer ve Agg tamponunu (h, w, 4) RGBA görünüm olarak döndürür."""
+        self.update(snapshot)
+        self.canvas.draw()
+        return np.asarray(self.canvas.buffer_rgba())
+    
+    def update(self, snapshot: Dict[str, Any]) -> None:
+        """Artist'leri verilen snapshot'a göre günceller."""
+        num_machines = self.num_machines
+        num_operators = self.num_operators
+        
+        machine_assignments = snapshot["machine_assignments"]
+        operator_skills = snapshot.get("operator_skills", [-1.0] * num_machines)
+        machine_statuses = snapshot.get("machine_statuses", None)
+        current_time = snapshot.get("time", 0.0)
+        shift_index = snapshot.get("shift_index", 0)
+        produced_parts = snapshot.get("produced_good_parts", 0)
+        episode_number = snapshot.get("episode_number", 0)
+        
+        for m_id in range(num_machines):
+            op_id = machine_assignments[m_id] if m_id < len(machine_assignments) else -1
+            
+            # Makinenin durumunu belirle (idle / busy / broken / maintenance)
+            if machine_statuses is not None and m_id < len(machine_statuses):
+                status_text, status_color = _STATUS_MAP.get(machine_statuses[m_id], _STATUS_IDLE)
+            else:
+                # History eski formatta ise, sadece operatör varlığına göre tahmin et
+                status_text, status_color = _STATUS_IDLE if op_id == -1 else _STATUS_BUSY
+            
+            status_label = self.machine_status_labels[m_id]
+            status_label.set_text(status_text)
+            status_label.set_color(status_color)
+            
+            # Makine karesi içinde mevcut operatörü veya "Idle" göster
+            op_label = self.machine_op_labels[m_id]
+            if op_id == -1:
+                # Makine boş (duruma göre Boşta/Arızalı/Bakım olabilir)
+                op_label.set_text("Idle")
+                op_label.set_fontproperties(_FONT_MACHINE_IDLE)
+                op_label.set_color('gray')
+            else:
+                # Makinede bir operatör var
+                op_label.set_text(f"O{op_id}")
+                op_label.set_fontproperties(_FONT_MACHINE_BUSY)
+                op_label.set_color('black')
+        
+        # Operatör başına: atanmış mı, x konumu (makine ya da park yeri) ve o makinedeki
+        # beceri. Sözlük kurmak yerine atama dizisinden tek seferde dağıtılıyor.
+        assignments = np.asarray(machine_assignments, dtype=np.int64)
+        busy_machines = np.flatnonzero(assignments != -1)
+        busy_operators = assignments[busy_machines]
+        # Beceri listesi kısaysa (eski history) eksik makineler için 0.0
+        machine_skills = np.zeros(assignments.shape[0])
+        known = min(len(operator_skills), assignments.shape[0])
+        machine_skills[:known] = operator_skills[:known]
+        
+        assigned = np.zeros(num_operators, dtype=bool)
+        assigned[busy_operators] = True
+        op_x = self.parking_x.copy()
+        op_x[busy_operators] = busy_machines
+        op_skill = np.zeros(num_operators)
+        op_skill[busy_operators] = machine_skills[busy_machines]
+        
+        # Daire boyutu beceriye göre (daha yüksek beceri = daha büyük daire, 0.14'ten 0.22'ye);
+        # aktif işçiler biraz daha büyük ve daha kalın kenarlı, boştakiler küçük ve soluk
+        radii = np.where(assigned, 0.14 + op_skill * 0.08, 0.12)
+        linewidths = np.where(assigned, 3.0, 1.5)
+        alphas = np.where(assigned, 0.8, 0.5)
+        offsets = np.column_stack((op_x, np.full(num_operators, 0.6)))
+        
+        # Operatör etiketleri
+        y_pos = 0.6
+        for op_id, (x_pos, skill, is_assigned) in enumerate(zip(op_x.tolist(), op_skill.tolist(), assigned.tolist())):
+            label = self.operator_labels[op_id]
+            skill_label = self.operator_skill_labels[op_id]
+            
+            if is_assigned:
+                # Operatörü beceri skoruyla etiketle
+                label.set_position((x_pos, y_pos))
+                label.set_text(f"O{op_id}\n{skill:.2f}" if skill >= 0 else f"O{op_id}")
+                
+                # Beceri skorunu operatörün altında göster
+                skill_label.set_position((x_pos, y_pos - 0.25))
+                skill_label.set_text(f"skill:{skill:.2f}")
+            else:
+                # Operatör boş - park alanında
+                label.set_position((x_pos, y_pos))
+                label.set_text(f"O{op_id}")
+                skill_label.set_text("")
+        
+        # Tüm operatör daireleri tek collection üzerinden güncelleniyor
+        self.operator_face_rgba[:, 3] = alphas
+        self.operator_edge_rgba[:, 3] = alphas
+        scatter = self.operator_scatter
+        scatter.set_offsets(offsets)
+        scatter.set_sizes((radii * self.radius_to_points) ** 2)
+        scatter.set_linewidths(linewidths)
+        scatter.set_facecolors(self.operator_face_rgba)
+        scatter.set_edgecolors(self.operator_edge_rgba)
+        
         # Zaman, vardiya, episode bilgisiyle başlık ayarla
-        title_text = f"{title}\n"
+        title_text = f"{self.title}\n"
         if episode_number > 0:
             title_text += f"Episode {episode_number} | "
         title_text += f"t={current_time:.1f} dk | vardiya={shift_index} | iyi parça={produced_parts}"
-        ax.set_title(title_text, fontsize=11, pad=10)
+        if title_text != self._title_text:
+            self.ax.title.set_text(title_text)
+            self._title_text = title_text
+
+
+# Paralel çizimde her worker sürecinin kendi sahnesi (_init_render_worker kuruyor)
+_worker_scene: Optional[_TimelineScene] = None
+
+
+def _init_render_worker(scene_args) -> None:
+    """Pool initializer: worker başına sahneyi bir kez kurar."""
+    global _worker_scene
+    _worker_scene = _TimelineScene(*scene_args)
+
+
+def _render_snapshot(snapshot: Dict[str, Any]) -> np.ndarray:
+    """Paralel çizim worker'ı: tek bir snapshot'ın RGBA frame'ini döndürür."""
+    # render() hep aynı tamponu döndürüyor; süreçten çıkmadan önce kopyala
+    return _worker_scene.render(snapshot).copy()
+
+
+def _save_frames(frames, num_frames: int, output_path: str, fps: int, video, ffmpeg: Optional[str],
+                 optimize: bool) -> None:
+    """
+    RGBA frame akışını video (ffmpeg) ya da GIF (libvips veya Pillow) olarak yazar.
+    
+    Frame'ler doğrudan Agg tamponundan geliyor: FuncAnimation + PillowWriter her frame'i
+    önce savefig ile ham bayta yazıp tekrar okuyordu, burada draw() + buffer_rgba() yetiyor.
+    Video ve Pillow yolu frame'leri geldikçe yazıyor; libvips yolu sadece
+    _VIPS_MAX_FRAMES'e kadar kullanılıyor çünkü frame'leri topluyor.
+    """
+    if video is not None:
+        codec, extra_args = video
+        _write_video(frames, output_path, ffmpeg, codec, extra_args, fps)
+        return
     
-    # Animasyon oluştur
-    anim = FuncAnimation(fig, update, frames=len(history), interval=1000/fps, repeat=True)
+    if pyvips is not None and num_frames <= _VIPS_MAX_FRAMES:
+        _write_gif_vips(frames, output_path, fps)
+    else:
+        _write_gif(frames, output_path, fps)
     
-    # GIF olarak kaydet
-    writer = PillowWriter(fps=fps)
-    anim.save(output_path, writer=writer)
+    if optimize:
+        _optimize_gif(output_path)
+
+
+def _quantize(rgb: np.ndarray) -> Image.Image:
+    """
+    RGB diziyi _GIF_COLORS renklik paletli görüntüye indirir.
+    
+    Paleti burada kendim çıkarıyorum: Pillow save() sırasında her frame'i 256 renge
+    median-cut ile indiriyordu (toplam sürenin yarısı). Hızlı octree + 64 renk hem
+    birkaç kat hızlı hem dosyayı küçültüyor; titreşim olmasın diye dithering kapalı.
+    """
+    return Image.fromarray(rgb).quantize(_GIF_COLORS, method=Image.FASTOCTREE, dither=Image.NONE)
+
+
+def _write_gif(frames, path: str, fps: int) -> None:
+    """
+    RGBA frame akışını GIF'e frame frame yazar (sonsuz döngü, sabit frame süresi).
+    
+    Pillow'un save_all'u tüm frame'leri bir listede toplayıp en sonda yazıyor; 10 fps'de
+    10 dakikalık bir history bu şekilde GB'larca bellek tutuyordu. Burada bellekte sadece
+    önceki frame ve süresi henüz kesinleşmemiş son frame duruyor. İlk frame tam olarak,
+    sonrakiler sadece önceki frame'e göre değişen dikdörtgen olarak (kendi yerel
+    paletiyle) yazılıyor; hiç değişmeyen frame yazılmıyor, süresi bir öncekine ekleniyor.
+    
+    Başlık ve frame blokları Pillow'un GifImagePlugin.getheader / getdata yardımcılarıyla
+    üretiliyor. Bunlar belgelenmiş kararlı API değil; Pillow 9.2 - 12.3 arasında aynı
+    çıktıyı verdiklerini denedim, requirements.txt'deki alt sınır da bu yüzden 9.2.
+    """
+    duration = int(1000 / fps)
+    frames = iter(frames)
+    first = next(frames)[:, :, :3]
+    previous = first.copy()  # Akıştaki diziler yeniden kullanılan tampon olabiliyor
+    
+    with open(path, "wb") as fp:
+        image = _quantize(first)
+        header, _ = GifImagePlugin.getheader(image, info={"loop": 0, "duration": duration})
+        fp.writelines(header)
+        # Yazılmayı bekleyen frame: [görüntü, ofset, süre, yerel palet mi]
+        pending = [image, (0, 0), duration, False]
+        
+        for rgba in frames:
+            rgb = rgba[:, :, :3]
+            changed = np.any(rgb != previous, axis=2)
+            rows = np.flatnonzero(changed.any(axis=1))
+            if rows.size == 0:
+                pending[2] += duration
+                continue
+            cols = np.flatnonzero(changed.any(axis=0))
+            top, bottom = int(rows[0]), int(rows[-1]) + 1
+            left, right = int(cols[0]), int(cols[-1]) + 1
+            
+            _write_gif_frame(fp, *pending)
+            pending = [_quantize(rgb[top:bottom, left:right]), (left, top), duration, True]
+            np.copyto(previous, rgb)
+        
+        _write_gif_frame(fp, *pending)
+        fp.write(b";")  # GIF sonu
+
+
+def _write_gif_vips(frames, path: str, fps: int) -> None:
+    """
+    RGBA frame'leri libvips'in gifsave'i ile yazar.
+    
+    libvips'in GIF kodlayıcısı (kuantalama + LZW) tamamen C'de ve bir frame'in paletini
+    yeterince uyuyorsa sonrakilerde yeniden kullanıyor (reuse); Pillow'daki frame başına
+    kuantalama + kodlamadan belirgin şekilde hızlı. Frame'ler alt alta tek bir uzun
+    görüntüye diziliyor, animasyon bilgisi page-height / delay / loop alanlarında.
+    libvips gifsave'i desteklemiyorsa (8.12 öncesi) toplanan frame'ler Pillow ile yazılıyor.
+    """
+    rgb_frames = [rgba[:, :, :3].copy() for rgba in frames]
+    height = rgb_frames[0].shape[0]
+    delay = int(1000 / fps)
+    
+    image = pyvips.Image.new_from_array(np.concatenate(rgb_frames)).copy()
+    image.set_type(pyvips.GValue.gint_type, "page-height", height)
+    image.set_type(pyvips.GValue.array_int_type, "delay", [delay] * len(rgb_frames))
+    image.set_type(pyvips.GValue.gint_type, "loop", 0)
+    try:
+        # bitdepth=6: _GIF_COLORS ile aynı 64 renk
+        image.gifsave(path, effort=1, bitdepth=6, reuse=True)
+    except pyvips.Error:
+        _write_gif(rgb_frames, path, fps)
+
+
+def _write_gif_frame(fp, image: Image.Image, offset: Tuple[int, int], duration: int, local_palette: bool) -> None:
+    """Tek bir frame'i (grafik kontrol bloğu + görüntü verisi) dosyaya yazar."""
+    fp.writelines(GifImagePlugin.getdata(image, offset, duration=duration,
+                                         include_color_table=local_palette))
+
+
+def _optimize_gif(path: str) -> None:
+    """
+    GIF'i gifsicle ile yerinde küçültür (frame farkları, palet, hafif kayıplı LZW).
     
-    print(f"GIF {output_path} dosyasına kaydedildi ({len(history)} frame)")
+    gifsicle isteğe bağlı; kurulu değilse ya da hata verirse dosya olduğu gibi kalıyor.
+    """
+    gifsicle = shutil.which("gifsicle")
+    if gifsicle is None:
+        return
+    subprocess.run([gifsicle, "--batch", "-O3", "--lossy=30", path], check=False)
+
+
+def _write_video(frames, path: str, ffmpeg: str, codec: str, extra_args: List[str], fps: int) -> None:
+    """
+    RGBA frame'leri ham video olarak ffmpeg'in stdin'ine akıtır.
+    
+    Frame'ler PNG'ye çevrilmeden doğrudan Agg tamponundan yazılıyor. Boyut ilk frame'den
+    okunuyor; yuv420p çift genişlik/yükseklik istediği için gerekirse bir piksellik dolgu ekleniyor.
+    ffmpeg hata verirse (örn. derlemesinde istenen codec yok) RuntimeError ile ffmpeg'in
+    kendi hata mesajı yükseltiliyor; yarım ya da hiç yazılmamış dosya başarı sayılmıyor.
+    """
+    frames = iter(frames)
+    first = next(frames)
+    height, width = first.shape[:2]
+    cmd = [
+        ffmpeg, "-y", "-loglevel", "error",
+        "-f", "rawvideo", "-pix_fmt", "rgba", "-s", f"{width}x{height}", "-r", str(fps), "-i", "-",
+        "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2",
+        "-c:v", codec, "-pix_fmt", "yuv420p", *extra_args,
+        path,
+    ]
+    proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        proc.stdin.write(first)
+        for rgba in frames:
+            proc.stdin.write(rgba)
+    except BrokenPipeError:
+        # ffmpeg erken çıktı; sebebi aşağıda stderr'den okunuyor
+        pass
+    except BaseException:
+        proc.kill()
+        proc.wait()
+        raise
+    # communicate() stdin'i kapatıp (kırık boruyu yok sayarak) ffmpeg'in bitmesini bekliyor
+    _, stderr = proc.communicate()
+    if proc.returncode != 0:
+        message = stderr.decode(errors="replace").strip()
+        raise RuntimeError(f"ffmpeg video yazamadı (çıkış kodu {proc.returncode}): {message}")